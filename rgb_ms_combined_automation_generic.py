@@ -18,8 +18,10 @@ run_combined_rgb_ms_automation()
 """
 
 import os
-import glob
 import re
+import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor
 import Metashape
 
 # Configuration - TO BE SET BY USER
@@ -28,16 +30,47 @@ gcp_base_path = None
 output_base_path = None
 routes_to_combine = []
 
+# Per-marker import details are logged at DEBUG level.
+# Enable with METASHAPE_VERBOSE=1 before loading, or log.setLevel(logging.DEBUG) in the console.
+VERBOSE = os.environ.get('METASHAPE_VERBOSE', '') not in ('', '0')
+
+# Console output goes through a logger; the handler is only added once when the script is re-loaded
+log = logging.getLogger('rgb_ms')
+if not log.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+    log.propagate = False
+log.setLevel(logging.DEBUG if VERBOSE else logging.INFO)
+
+# MS band file suffixes (matched against upper-cased file names), most specific first
+MS_BAND_SUFFIXES = (('_MS_NIR.TIF', 'NIR'), ('_MS_RE.TIF', 'RE'), ('_MS_R.TIF', 'R'), ('_MS_G.TIF', 'G'))
+
+# DJI route folder names: DJI_<timestamp>_<route number>_<name>
+_DJI_FOLDER_RE = re.compile(r'DJI_\d{12,14}_(\d{3})_')
+
+# Number of images passed to a single chunk.addPhotos() call
+ADD_PHOTOS_BATCH_SIZE = 500
+
+# Upper bound on _vN suffixes tried when claiming a new project folder
+MAX_PROJECT_VERSION_ATTEMPTS = 1000
+
+# Marker file created exclusively in a reused empty project folder by the run that claims it
+PROJECT_CLAIM_MARKER = '.claimed'
+
+# Cached DCIM scans, keyed by (dcim_path, DCIM folder mtime)
+_scan_cache = {}
+
 def configure_paths(dcim, gcp, output):
     """Configure the base paths for processing"""
     global dcim_base_path, gcp_base_path, output_base_path
     dcim_base_path = dcim
     gcp_base_path = gcp
     output_base_path = output
-    print(f"Paths configured:")
-    print(f"  DCIM: {dcim_base_path}")
-    print(f"  GCP: {gcp_base_path}")
-    print(f"  Output: {output_base_path}")
+    log.info(f"Paths configured:")
+    log.info(f"  DCIM: {dcim_base_path}")
+    log.info(f"  GCP: {gcp_base_path}")
+    log.info(f"  Output: {output_base_path}")
 
 def configure_routes(route_numbers, dcim_path=None, gcp_path=None, output_path=None):
     """Configure routes and optionally update paths"""
@@ -46,12 +79,12 @@ def configure_routes(route_numbers, dcim_path=None, gcp_path=None, output_path=N
     if dcim_path: dcim_base_path = dcim_path
     if gcp_path: gcp_base_path = gcp_path
     if output_path: output_base_path = output_path
-    print(f"Routes configured: {', '.join(route_numbers)}")
+    log.info(f"Routes configured: {', '.join(route_numbers)}")
     if dcim_path or gcp_path or output_path:
-        print(f"Paths updated:")
-        if dcim_path: print(f"  DCIM: {dcim_base_path}")
-        if gcp_path: print(f"  GCP: {gcp_base_path}")
-        if output_path: print(f"  Output: {output_base_path}")
+        log.info(f"Paths updated:")
+        if dcim_path: log.info(f"  DCIM: {dcim_base_path}")
+        if gcp_path: log.info(f"  GCP: {gcp_base_path}")
+        if output_path: log.info(f"  Output: {output_base_path}")
 
 def validate_configuration():
     """Validate that all required paths are configured"""
@@ -65,128 +98,211 @@ def validate_configuration():
         raise ValueError("Routes not configured. Use configure_routes()")
     return True
 
-def scan_dcim_folders_combined(dcim_path):
+class RouteInfo:
+    """Scanned RGB+MS route folder (slotted record, one per DJI route folder)"""
+    __slots__ = ('folder_name', 'folder_path', 'route_number', 'rgb_files', 'ms_files',
+                 'image_files', 'gcp_path', 'name', 'ms_bands')
+
+    def __init__(self, folder_name, folder_path, route_number, rgb_files, ms_files,
+                 image_files=None, gcp_path='', name='', ms_bands=None):
+        self.folder_name = folder_name
+        self.folder_path = folder_path
+        self.route_number = route_number
+        self.rgb_files = rgb_files
+        self.ms_files = ms_files
+        self.image_files = image_files if image_files is not None else rgb_files + ms_files
+        self.gcp_path = gcp_path
+        self.name = name
+        self.ms_bands = ms_bands if ms_bands is not None else {}
+
+    @property
+    def rgb_count(self):
+        return len(self.rgb_files)
+
+    @property
+    def ms_count(self):
+        return len(self.ms_files)
+
+    @property
+    def total_count(self):
+        return len(self.image_files)
+
+    def copy(self, **changes):
+        """Return a shallow copy, optionally overriding fields"""
+        fields = {slot: getattr(self, slot) for slot in self.__slots__}
+        fields.update(changes)
+        return RouteInfo(**fields)
+
+def invalidate_scan_cache():
+    """Forget cached DCIM scans so the next scan re-reads the disk"""
+    _scan_cache.clear()
+
+def scan_dcim_folders_combined(dcim_path, wanted_route_numbers=None):
+    # Reuse the previous scan while the DCIM folder itself is unchanged.
+    # Only the top-level mtime is checked; use invalidate_scan_cache() after
+    # adding images to an existing route folder.
+    # With wanted_route_numbers, only the folders of those routes are listed;
+    # such partial scans are not cached.
+    try:
+        cache_key = (dcim_path, os.stat(dcim_path).st_mtime_ns)
+    except OSError:
+        cache_key = None
+    if cache_key in _scan_cache:
+        log.info(f"Using cached DCIM scan for: {dcim_path}")
+        return list(_scan_cache[cache_key])
+    route_folders = _scan_dcim_folders_uncached(dcim_path, wanted_route_numbers)
+    if cache_key is not None and wanted_route_numbers is None:
+        _scan_cache[cache_key] = route_folders
+    return list(route_folders)
+
+def _enumerate_folder(folder_path):
+    """Classify the RGB and MS images of one route folder in a single directory pass"""
+    rgb_d_files, rgb_alt_files, all_jpg = [], [], []
+    ms_band_files, all_ms_tif = [], []
+    ms_bands = {'G': 0, 'R': 0, 'RE': 0, 'NIR': 0}
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            # Upper-case once; every test below runs against this string
+            name_upper = entry.name.upper()
+            path = entry.path
+            if name_upper.endswith('.JPG'):
+                if name_upper.endswith('_D.JPG'):
+                    rgb_d_files.append(path)
+                elif name_upper.endswith('D.JPG'):
+                    rgb_alt_files.append(path)
+                all_jpg.append(path)
+            elif name_upper.endswith('.TIF') and 'MS' in name_upper:
+                for suffix, band in MS_BAND_SUFFIXES:
+                    if name_upper.endswith(suffix):
+                        ms_band_files.append(path)
+                        ms_bands[band] += 1
+                        break
+                all_ms_tif.append(path)
+
+    # Same preference order as before: *_D.JPG, *D.JPG, any JPG
+    rgb_files = sorted(rgb_d_files or rgb_alt_files or all_jpg)
+    # Band-suffixed MS images, falling back to any TIF with MS in name
+    ms_files = sorted(ms_band_files or all_ms_tif)
+    return rgb_files, ms_files, ms_bands
+
+def _scan_dcim_folders_uncached(dcim_path, wanted_route_numbers=None):
     route_folders = []
     if not os.path.exists(dcim_path):
-        print(f"ERROR: DCIM folder not found: {dcim_path}")
+        log.error(f"ERROR: DCIM folder not found: {dcim_path}")
+        return route_folders
+    log.info(f"Scanning DCIM directory for RGB+MS images: {dcim_path}")
+    wanted = set(wanted_route_numbers) if wanted_route_numbers is not None else None
+    tasks = []
+    with os.scandir(dcim_path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                match = _DJI_FOLDER_RE.match(entry.name)
+                if match:
+                    route_number = match.group(1)
+                    # Keep every folder of a wanted route: whether it has both RGB
+                    # and MS images is only known after _enumerate_folder
+                    if wanted is not None and route_number not in wanted:
+                        continue
+                    tasks.append((entry.name, entry.path, route_number))
+    if not tasks:
         return route_folders
-    print(f"Scanning DCIM directory for RGB+MS images: {dcim_path}")
-    pattern = r'DJI_\d{12,14}_(\d{3})_.*'
-    for folder in os.listdir(dcim_path):
-        folder_path = os.path.join(dcim_path, folder)
-        if os.path.isdir(folder_path):
-            match = re.match(pattern, folder)
-            if match:
-                route_number = match.group(1)
-                
-                # Look for RGB images
-                rgb_pattern = os.path.join(folder_path, "*_D.JPG")
-                rgb_files = glob.glob(rgb_pattern)
-                if not rgb_files:
-                    rgb_pattern_alt = os.path.join(folder_path, "*D.JPG")
-                    rgb_files = glob.glob(rgb_pattern_alt)
-                if not rgb_files:
-                    all_jpg = glob.glob(os.path.join(folder_path, "*.JPG"))
-                    all_jpg.extend(glob.glob(os.path.join(folder_path, "*.jpg")))
-                    rgb_files = all_jpg
-                
-                # Look for MS images
-                ms_patterns = ["*_MS_G.TIF", "*_MS_R.TIF", "*_MS_RE.TIF", "*_MS_NIR.TIF"]
-                ms_files = []
-                for pattern_ms in ms_patterns:
-                    ms_pattern = os.path.join(folder_path, pattern_ms)
-                    ms_files.extend(glob.glob(ms_pattern))
-                
-                # Also check lowercase variants
-                if not ms_files:
-                    ms_patterns_lower = ["*_ms_g.tif", "*_ms_r.tif", "*_ms_re.tif", "*_ms_nir.tif"]
-                    for pattern_ms in ms_patterns_lower:
-                        ms_pattern = os.path.join(folder_path, pattern_ms)
-                        ms_files.extend(glob.glob(ms_pattern))
-                
-                # Fallback: any TIF with MS in name
-                if not ms_files:
-                    all_tif = glob.glob(os.path.join(folder_path, "*MS*.TIF"))
-                    all_tif.extend(glob.glob(os.path.join(folder_path, "*ms*.tif")))
-                    ms_files = all_tif
-                
-                # Only include routes that have both RGB and MS images
-                if rgb_files and ms_files:
-                    all_images = rgb_files + ms_files
-                    route_folders.append({
-                        'folder_name': folder, 
-                        'folder_path': folder_path, 
-                        'route_number': route_number, 
-                        'rgb_count': len(rgb_files),
-                        'ms_count': len(ms_files),
-                        'total_count': len(all_images),
-                        'image_files': all_images,
-                        'rgb_files': rgb_files,
-                        'ms_files': ms_files
-                    })
-                    print(f"  Found Route {route_number}: {len(rgb_files)} RGB + {len(ms_files)} MS = {len(all_images)} total images")
-                elif rgb_files:
-                    print(f"  Route {route_number}: {len(rgb_files)} RGB images (no MS images found)")
-                elif ms_files:
-                    print(f"  Route {route_number}: {len(ms_files)} MS images (no RGB images found)")
-    return sorted(route_folders, key=lambda x: x['route_number'])
+
+    # Route folders are independent, so list them concurrently (I/O-bound)
+    with ThreadPoolExecutor(max_workers=min(16, len(tasks))) as executor:
+        results = list(executor.map(_enumerate_folder, [task[1] for task in tasks]))
+
+    # Build route entries on the main thread to keep output ordering deterministic
+    for (folder, folder_path, route_number), (rgb_files, ms_files, ms_bands) in zip(tasks, results):
+        # Only include routes that have both RGB and MS images
+        if rgb_files and ms_files:
+            route = RouteInfo(folder, folder_path, route_number, rgb_files, ms_files, ms_bands=ms_bands)
+            route_folders.append(route)
+            log.info(f"  Found Route {route_number}: {route.rgb_count} RGB + {route.ms_count} MS = {route.total_count} total images")
+        elif rgb_files:
+            log.info(f"  Route {route_number}: {len(rgb_files)} RGB images (no MS images found)")
+        elif ms_files:
+            log.info(f"  Route {route_number}: {len(ms_files)} MS images (no RGB images found)")
+    return sorted(route_folders, key=lambda route: route.route_number)
 
 def enhanced_save_project(doc, chunk, project_path, step_name=""):
     try:
-        print(f"Saving project{' after ' + step_name if step_name else ''}...")
+        log.info(f"Saving project{' after ' + step_name if step_name else ''}...")
         doc.save(project_path)
-        print(f"Project saved successfully{' after ' + step_name if step_name else ''}")
+        log.info(f"Project saved successfully{' after ' + step_name if step_name else ''}")
         return True
     except Exception as e:
-        print(f"ERROR saving project{' after ' + step_name if step_name else ''}: {str(e)}")
+        log.error(f"ERROR saving project{' after ' + step_name if step_name else ''}: {str(e)}")
         return False
 
 def create_combined_project_structure(output_base, route_numbers):
     route_list = "_".join(route_numbers)
     base_project_folder = f"combined_routes_{route_list}_RGB_MS"
-    base_project_file = f"combined_routes_{route_list}_RGB_MS.psx"
-    project_folder = base_project_folder
-    project_file = base_project_file
-    version = 1
-    while True:
-        project_path = os.path.join(output_base, project_folder)
-        project_full_path = os.path.join(project_path, project_file)
-        if os.path.exists(project_path):
-            if os.listdir(project_path):
-                version += 1
-                project_folder = f"{base_project_folder}_v{version}"
-                project_file = f"combined_routes_{route_list}_RGB_MS_v{version}.psx"
-                print(f"Folder {base_project_folder} exists, trying {project_folder}")
-                continue
-            else:
+    version_re = re.compile(rf'^{re.escape(base_project_folder)}(?:_v(\d+))?$')
+    
+    # Find the highest existing version with a single directory listing
+    try:
+        entries = os.listdir(output_base)
+    except FileNotFoundError:
+        entries = []
+    max_existing = 0
+    for entry in entries:
+        match = version_re.match(entry)
+        if match:
+            max_existing = max(max_existing, int(match.group(1) or 1))
+    
+    # Reuse the latest folder if it is still empty, claiming it with a marker file created
+    # with O_CREAT | O_EXCL; otherwise claim the next free version with os.mkdir. Both are
+    # atomic, so two runs started at the same time cannot end up in the same folder.
+    version = max(max_existing, 1)
+    project_folder = base_project_folder if version == 1 else f"{base_project_folder}_v{version}"
+    project_path = os.path.join(output_base, project_folder)
+    claimed = False
+    if max_existing and not os.listdir(project_path):
+        try:
+            os.close(os.open(os.path.join(project_path, PROJECT_CLAIM_MARKER), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            claimed = True
+        except FileExistsError:
+            pass
+    if not claimed:
+        if max_existing:
+            version += 1
+        os.makedirs(output_base, exist_ok=True)
+        for _ in range(MAX_PROJECT_VERSION_ATTEMPTS):
+            project_folder = base_project_folder if version == 1 else f"{base_project_folder}_v{version}"
+            project_path = os.path.join(output_base, project_folder)
+            try:
+                os.mkdir(project_path)
                 break
+            except FileExistsError:
+                version += 1
         else:
-            break
-    os.makedirs(project_path, exist_ok=True)
-    project_full_path = os.path.join(project_path, project_file)
+            raise RuntimeError(f"Could not create a free project folder for {base_project_folder} after {MAX_PROJECT_VERSION_ATTEMPTS} attempts")
+    project_full_path = os.path.join(project_path, f"{project_folder}.psx")
     if version > 1:
-        print(f"Created versioned project folder: {project_folder}")
+        log.info(f"Folder {base_project_folder} exists, using {project_folder}")
     return project_path, project_full_path
 
 def find_routes_by_numbers(route_numbers, dcim_path):
-    print(f"Looking for RGB+MS routes: {', '.join(route_numbers)}")
-    all_routes = scan_dcim_folders_combined(dcim_path)
+    log.info(f"Looking for RGB+MS routes: {', '.join(route_numbers)}")
+    all_routes = scan_dcim_folders_combined(dcim_path, wanted_route_numbers=set(route_numbers))
     if not all_routes:
-        print("No combined RGB+MS routes found in DCIM folder!")
+        log.info("No combined RGB+MS routes found in DCIM folder!")
         return []
+    routes_by_number = {}
+    for route in all_routes:
+        routes_by_number.setdefault(route.route_number, route)
     found_routes = []
     for route_num in route_numbers:
-        route_found = False
-        for route in all_routes:
-            if route['route_number'] == route_num:
-                found_routes.append(route)
-                route_found = True
-                print(f"  Route {route_num}: {route['rgb_count']} RGB + {route['ms_count']} MS = {route['total_count']} total images in {route['folder_name']}")
-                break
-        if not route_found:
-            print(f"  Route {route_num}: Not found!")
+        route = routes_by_number.get(route_num)
+        if route is not None:
+            found_routes.append(route)
+            log.info(f"  Route {route_num}: {route.rgb_count} RGB + {route.ms_count} MS = {route.total_count} total images in {route.folder_name}")
+        else:
+            log.info(f"  Route {route_num}: Not found!")
     if len(found_routes) < 2:
-        print(f"ERROR: Need at least 2 routes for combination, found {len(found_routes)}")
+        log.error(f"ERROR: Need at least 2 routes for combination, found {len(found_routes)}")
         return []
     return found_routes
 
@@ -196,215 +312,228 @@ def get_gcp_file_path(route_number, gcp_base_path):
     return gcp_file_path
 
 def validate_routes_and_gcps(routes, gcp_base_path):
-    print("Validating RGB+MS routes and GCP files...")
+    log.info("Validating RGB+MS routes and GCP files...")
     valid_routes = []
-    for route in routes:
-        route_num = route['route_number']
-        gcp_path = get_gcp_file_path(route_num, gcp_base_path)
-        print(f"\nValidating Route {route_num}:")
-        print(f"  DCIM: {route['folder_name']} ({route['rgb_count']} RGB + {route['ms_count']} MS = {route['total_count']} total images)")
-        print(f"  GCP: {os.path.basename(gcp_path)}")
-        if not os.path.exists(gcp_path):
-            print(f"  ERROR: GCP file not found: {gcp_path}")
+    # Check GCP files concurrently; each check is a stat that may hit network storage
+    gcp_paths = [get_gcp_file_path(route.route_number, gcp_base_path) for route in routes]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        gcp_exists = list(executor.map(os.path.exists, gcp_paths))
+    for route, gcp_path, exists in zip(routes, gcp_paths, gcp_exists):
+        route_num = route.route_number
+        log.info(f"\nValidating Route {route_num}:")
+        log.info(f"  DCIM: {route.folder_name} ({route.rgb_count} RGB + {route.ms_count} MS = {route.total_count} total images)")
+        log.info(f"  GCP: {os.path.basename(gcp_path)}")
+        if not exists:
+            log.error(f"  ERROR: GCP file not found: {gcp_path}")
             continue
         else:
-            print(f"  GCP file exists")
-        route_with_gcp = route.copy()
-        route_with_gcp['gcp_path'] = gcp_path
-        route_with_gcp['name'] = f"Route_{route_num}_RGB_MS"
+            log.info(f"  GCP file exists")
+        route_with_gcp = route.copy(gcp_path=gcp_path, name=f"Route_{route_num}_RGB_MS")
         valid_routes.append(route_with_gcp)
-        print(f"  Route {route_num} validation successful")
-    print(f"\nValidation Summary: {len(valid_routes)}/{len(routes)} RGB+MS routes valid")
+        log.info(f"  Route {route_num} validation successful")
+    log.info(f"\nValidation Summary: {len(valid_routes)}/{len(routes)} RGB+MS routes valid")
     return valid_routes
 
 def diagnose_datasets(valid_routes):
-    print("\nDIAGNOSING RGB+MS DATASET COMPATIBILITY:")
-    print("=" * 50)
+    log.info("\nDIAGNOSING RGB+MS DATASET COMPATIBILITY:")
+    log.info("=" * 50)
     
     # Check image counts
-    total_rgb = sum(route['rgb_count'] for route in valid_routes)
-    total_ms = sum(route['ms_count'] for route in valid_routes)
-    total_images = sum(route['total_count'] for route in valid_routes)
-    print(f"Total images across all routes: {total_rgb} RGB + {total_ms} MS = {total_images} total")
+    total_rgb = sum(route.rgb_count for route in valid_routes)
+    total_ms = sum(route.ms_count for route in valid_routes)
+    total_images = sum(route.total_count for route in valid_routes)
+    log.info(f"Total images across all routes: {total_rgb} RGB + {total_ms} MS = {total_images} total")
     
     for route in valid_routes:
-        print(f"  Route {route['route_number']}: {route['rgb_count']} RGB + {route['ms_count']} MS = {route['total_count']} total")
+        log.info(f"  Route {route.route_number}: {route.rgb_count} RGB + {route.ms_count} MS = {route.total_count} total")
         
         # Sample RGB images
-        sample_rgb = route['rgb_files'][:3]
-        print(f"    Sample RGB: {[os.path.basename(img) for img in sample_rgb]}")
+        sample_rgb = route.rgb_files[:3]
+        log.info(f"    Sample RGB: {[os.path.basename(img) for img in sample_rgb]}")
         
         # Sample MS images and check bands
-        sample_ms = route['ms_files'][:4]
-        print(f"    Sample MS: {[os.path.basename(img) for img in sample_ms]}")
+        sample_ms = route.ms_files[:4]
+        log.info(f"    Sample MS: {[os.path.basename(img) for img in sample_ms]}")
         
-        # Check MS band distribution
-        bands = {'G': 0, 'R': 0, 'RE': 0, 'NIR': 0}
-        for img in route['ms_files']:
-            img_name = os.path.basename(img).upper()
-            if '_MS_G.' in img_name:
-                bands['G'] += 1
-            elif '_MS_R.' in img_name:
-                bands['R'] += 1
-            elif '_MS_RE.' in img_name:
-                bands['RE'] += 1
-            elif '_MS_NIR.' in img_name:
-                bands['NIR'] += 1
-        
-        print(f"    MS band distribution: G={bands['G']}, R={bands['R']}, RE={bands['RE']}, NIR={bands['NIR']}")
+        # MS band distribution (counted during the DCIM scan)
+        bands = route.ms_bands
+        log.info(f"    MS band distribution: G={bands['G']}, R={bands['R']}, RE={bands['RE']}, NIR={bands['NIR']}")
     
     # Check if routes are from same date/session
-    folder_dates = []
+    folder_dates = set()
     for route in valid_routes:
-        folder_name = route['folder_name']
+        folder_name = route.folder_name
         if folder_name.startswith('DJI_'):
-            date_part = folder_name.split('_')[1][:8]  # YYYYMMDD
-            folder_dates.append(date_part)
-            print(f"  Route {route['route_number']} date: {date_part}")
+            date_part = folder_name[4:12]  # DJI_YYYYMMDD...
+            folder_dates.add(date_part)
+            log.info(f"  Route {route.route_number} date: {date_part}")
     
-    if len(set(folder_dates)) > 1:
-        print("  WARNING: Routes are from different dates - this may cause matching issues!")
+    if len(folder_dates) > 1:
+        log.warning("  WARNING: Routes are from different dates - this may cause matching issues!")
     else:
-        print("  OK: All routes from same date")
+        log.info("  OK: All routes from same date")
     
-    print("=" * 50)
+    log.info("=" * 50)
     return True
 
+def _marker_stats(chunk, with_projections=True, with_details=False):
+    """Collect marker totals (and optionally per-marker details) in a single pass over chunk.markers"""
+    total = 0
+    enabled = 0
+    projections = 0
+    details = []
+    for marker in chunk.markers:
+        total += 1
+        marker_enabled = marker.reference.enabled
+        if marker_enabled:
+            enabled += 1
+        if with_projections:
+            marker_projections = len(marker.projections)
+            projections += marker_projections
+            if with_details:
+                details.append((marker.label, marker_projections, marker_enabled))
+    return total, enabled, projections, details
+
 def import_route_as_chunk(doc, route_info):
-    route_num = route_info['route_number']
-    print(f"\nImporting RGB+MS Route {route_num}: {route_info['name']}")
+    route_num = route_info.route_number
+    log.info(f"\nImporting RGB+MS Route {route_num}: {route_info.name}")
     chunk = doc.addChunk()
-    chunk.label = route_info['name']
+    chunk.label = route_info.name
     chunk.crs = Metashape.CoordinateSystem("EPSG::4326")
-    print(f"  Set initial coordinate system to WGS84 (EPSG:4326)")
-    print(f"  Adding {route_info['total_count']} images ({route_info['rgb_count']} RGB + {route_info['ms_count']} MS) as Multi-Camera system...")
+    log.info(f"  Set initial coordinate system to WGS84 (EPSG:4326)")
+    log.info(f"  Adding {route_info.total_count} images ({route_info.rgb_count} RGB + {route_info.ms_count} MS) as Multi-Camera system...")
     
-    # Add all images as Multi-Camera system for RGB+MS combination
-    chunk.addPhotos(route_info['image_files'])
+    # Add all images as Multi-Camera system for RGB+MS combination.
+    # Sorted by file name (DJI names encode capture order) for sequential reads, in batches.
+    sorted_images = sorted(route_info.image_files)
+    for i in range(0, len(sorted_images), ADD_PHOTOS_BATCH_SIZE):
+        batch = sorted_images[i:i + ADD_PHOTOS_BATCH_SIZE]
+        cameras_before = len(chunk.cameras)
+        chunk.addPhotos(batch)
+        added = len(chunk.cameras) - cameras_before
+        if added < len(batch):
+            log.warning(f"    WARNING: Only {added}/{len(batch)} images added from batch starting at image {i + 1}")
     if len(chunk.cameras) == 0:
         raise RuntimeError(f"No cameras were added for RGB+MS Route {route_num}")
-    print(f"  Successfully added {len(chunk.cameras)} cameras (MultiCamera layout for RGB+MS)")
+    log.info(f"  Successfully added {len(chunk.cameras)} cameras (MultiCamera layout for RGB+MS)")
     
-    gcp_filename = os.path.basename(route_info['gcp_path'])
-    print(f"  Importing markers from: {gcp_filename}")
+    gcp_filename = os.path.basename(route_info.gcp_path)
+    log.info(f"  Importing markers from: {gcp_filename}")
     try:
-        chunk.importMarkers(path=route_info['gcp_path'])
-        imported_count = len(chunk.markers)
-        enabled_count = sum(1 for marker in chunk.markers if marker.reference.enabled)
-        print(f"  Imported {imported_count} GCP markers ({enabled_count} enabled, {imported_count-enabled_count} check points)")
-        for marker in chunk.markers:
-            projections = len(marker.projections)
-            enabled_status = "[ENABLED]" if marker.reference.enabled else "[DISABLED]"
-            print(f"    {marker.label}: {projections} projections {enabled_status}")
+        chunk.importMarkers(path=route_info.gcp_path)
+        verbose = log.isEnabledFor(logging.DEBUG)
+        imported_count, enabled_count, _, marker_details = _marker_stats(chunk, with_projections=verbose, with_details=verbose)
+        log.info(f"  Imported {imported_count} GCP markers ({enabled_count} enabled, {imported_count-enabled_count} check points)")
+        if verbose:
+            for label, projections, enabled in marker_details:
+                enabled_status = "[ENABLED]" if enabled else "[DISABLED]"
+                log.debug(f"    {label}: {projections} projections {enabled_status}")
         chunk.crs = Metashape.CoordinateSystem("EPSG::4258")
-        print(f"  Set coordinate system to ETRS89 (EPSG:4258)")
+        log.info(f"  Set coordinate system to ETRS89 (EPSG:4258)")
         return chunk, imported_count, enabled_count
     except Exception as e:
         raise RuntimeError(f"Failed to import markers for RGB+MS Route {route_num}: {str(e)}")
 
 def merge_chunks_with_validation(doc, chunks_to_merge):
-    print(f"\nMerging {len(chunks_to_merge)} RGB+MS chunks...")
-    total_markers_before = 0
-    total_projections_before = 0
-    total_cameras_before = 0
+    log.info(f"\nMerging {len(chunks_to_merge)} RGB+MS chunks...")
     chunks_before_merge = len(doc.chunks)
+    marker_stats_before = [_marker_stats(chunk) for chunk in chunks_to_merge]
+    total_markers_before = sum(stats[0] for stats in marker_stats_before)
+    total_projections_before = sum(stats[2] for stats in marker_stats_before)
+    total_cameras_before = sum(len(chunk.cameras) for chunk in chunks_to_merge)
+    log.info(f"  Before merge: {len(chunks_to_merge)} chunks, {total_cameras_before} cameras, {total_markers_before} markers, {total_projections_before} total projections")
     
-    for chunk in chunks_to_merge:
-        total_markers_before += len(chunk.markers)
-        total_cameras_before += len(chunk.cameras)
-        for marker in chunk.markers:
-            total_projections_before += len(marker.projections)
-    print(f"  Before merge: {len(chunks_to_merge)} chunks, {total_cameras_before} cameras, {total_markers_before} markers, {total_projections_before} total projections")
-    
-    # Check coordinate systems
+    # Check coordinate systems (compared by authority/name rather than full WKT strings)
     coordinate_systems = set()
     for chunk in chunks_to_merge:
-        if chunk.crs:
-            coordinate_systems.add(str(chunk.crs))
+        crs = chunk.crs
+        if crs:
+            coordinate_systems.add((getattr(crs, 'authority', None), getattr(crs, 'name', None)))
     
-    print(f"  Coordinate systems found: {len(coordinate_systems)}")
-    for crs in coordinate_systems:
-        print(f"    {crs}")
+    log.info(f"  Coordinate systems found: {len(coordinate_systems)}")
+    if len(coordinate_systems) > 1:
+        for chunk in chunks_to_merge:
+            log.info(f"    {chunk.label}: {chunk.crs}")
     
     try:
         # Align chunks before merging if needed
         if len(coordinate_systems) > 1:
-            print("  Aligning chunks (multiple coordinate systems detected)...")
+            log.info("  Aligning chunks (multiple coordinate systems detected)...")
             doc.alignChunks(chunks_to_merge)
-            print("  Chunks aligned successfully")
+            log.info("  Chunks aligned successfully")
         else:
-            print("  All chunks use same coordinate system - no alignment needed")
+            log.info("  All chunks use same coordinate system - no alignment needed")
         
         # Merge chunks - this creates a NEW chunk
+        keys_before_merge = {chunk.key for chunk in doc.chunks}
         doc.mergeChunks(chunks=chunks_to_merge, merge_markers=True, merge_tiepoints=True, copy_depth_maps=False, copy_point_clouds=False, copy_models=False, copy_elevations=False, copy_orthomosaics=False)
-        print("  RGB+MS chunks merged successfully")
-        
-        # Find the NEW merged chunk
-        chunks_after_merge = len(doc.chunks)
-        print(f"  Chunks after merge: {chunks_after_merge} (was {chunks_before_merge})")
+        log.info("  RGB+MS chunks merged successfully")
         
-        if chunks_after_merge <= chunks_before_merge:
+        # Find the NEW merged chunk: the only chunk that did not exist before the merge
+        chunks_after_merge = list(doc.chunks)
+        log.info(f"  Chunks after merge: {len(chunks_after_merge)} (was {chunks_before_merge})")
+        new_chunks = [chunk for chunk in chunks_after_merge if chunk.key not in keys_before_merge]
+        if not new_chunks:
             raise RuntimeError("No new chunk created during merge!")
+        if len(new_chunks) != 1:
+            raise RuntimeError(f"Expected 1 new chunk after merge, found {len(new_chunks)}")
         
-        # The new merged chunk is typically the last one
-        merged_chunk = doc.chunks[-1]
+        merged_chunk = new_chunks[0]
         merged_chunk.label = "Merged_RGB_MS_Routes"
-        print(f"  New merged RGB+MS chunk created: {merged_chunk.label}")
+        log.info(f"  New merged RGB+MS chunk created: {merged_chunk.label}")
         
         # Remove the original unmerged chunks
-        print(f"  Removing {len(chunks_to_merge)} original chunks...")
-        chunks_to_remove = []
-        for original_chunk in chunks_to_merge:
-            if original_chunk in doc.chunks:
-                chunks_to_remove.append(original_chunk)
+        log.info(f"  Removing {len(chunks_to_merge)} original chunks...")
+        # Chunk keys are stable identifiers; one pass over doc.chunks instead of one per chunk
+        existing_keys = {chunk.key for chunk in doc.chunks}
+        chunks_to_remove = [chunk for chunk in chunks_to_merge if chunk.key in existing_keys]
         
         # Remove chunks in reverse order to avoid index issues
         for chunk_to_remove in reversed(chunks_to_remove):
             try:
                 chunk_label = chunk_to_remove.label
                 doc.remove(chunk_to_remove)
-                print(f"    Removed: {chunk_label}")
+                log.info(f"    Removed: {chunk_label}")
             except Exception as e:
-                print(f"    Error removing {chunk_to_remove.label}: {e}")
+                log.error(f"    Error removing {chunk_to_remove.label}: {e}")
         
-        print(f"  Successfully removed {len(chunks_to_remove)} original chunks")
+        log.info(f"  Successfully removed {len(chunks_to_remove)} original chunks")
         
         # Verify cleanup
         final_chunk_count = len(doc.chunks)
         if final_chunk_count != 1:
-            print(f"  WARNING: Expected 1 chunk after cleanup, found {final_chunk_count}")
-            print(f"  Remaining chunks:")
+            log.warning(f"  WARNING: Expected 1 chunk after cleanup, found {final_chunk_count}")
+            log.info(f"  Remaining chunks:")
             for i, chunk in enumerate(doc.chunks):
-                print(f"    {i+1}. {chunk.label}")
+                log.info(f"    {i+1}. {chunk.label}")
         else:
-            print(f"  Cleanup verified: Only merged RGB+MS chunk remains")
+            log.info(f"  Cleanup verified: Only merged RGB+MS chunk remains")
         
         # Verify the merge worked
-        merged_markers = len(merged_chunk.markers)
+        merged_markers, _, merged_projections, _ = _marker_stats(merged_chunk)
         merged_cameras = len(merged_chunk.cameras)
-        merged_projections = sum(len(marker.projections) for marker in merged_chunk.markers)
         
-        print(f"  Final result: {len(doc.chunks)} chunk, {merged_cameras} cameras, {merged_markers} markers, {merged_projections} total projections")
+        log.info(f"  Final result: {len(doc.chunks)} chunk, {merged_cameras} cameras, {merged_markers} markers, {merged_projections} total projections")
         
         if merged_cameras != total_cameras_before:
-            print(f"  WARNING: Camera count mismatch! Expected {total_cameras_before}, got {merged_cameras}")
+            log.warning(f"  WARNING: Camera count mismatch! Expected {total_cameras_before}, got {merged_cameras}")
         else:
-            print(f"  Camera count validated: {merged_cameras}")
+            log.info(f"  Camera count validated: {merged_cameras}")
         
-        print(f"  Marker consolidation: {total_markers_before} -> {merged_markers} (duplicates merged)")
+        log.info(f"  Marker consolidation: {total_markers_before} -> {merged_markers} (duplicates merged)")
         
         if merged_projections == 0:
             raise RuntimeError("No marker projections found after merge!")
         
-        print(f"  RGB+MS merge validation completed successfully")
+        log.info(f"  RGB+MS merge validation completed successfully")
         return merged_chunk
         
     except Exception as e:
         raise RuntimeError(f"RGB+MS chunk merge failed: {str(e)}")
 
 def match_photos(chunk):
-    print(f"\nStep 2: Matching RGB+MS photos...")
-    print("  Settings: Downscale=1 (full resolution for RGB+MS combination), Generic preselection=True, Reference preselection=True")
+    log.info(f"\nStep 2: Matching RGB+MS photos...")
+    log.info("  Settings: Downscale=1 (full resolution for RGB+MS combination), Generic preselection=True, Reference preselection=True")
     
     chunk.matchPhotos(
         downscale=1,  # Full resolution for RGB+MS combination
@@ -412,53 +541,55 @@ def match_photos(chunk):
         reference_preselection=True
     )
     
-    print(f"RGB+MS photo matching completed successfully")
-    print(f"  (Check console output for tie point statistics)")
+    log.info(f"RGB+MS photo matching completed successfully")
+    log.info(f"  (Check console output for tie point statistics)")
     return True
 
 def align_cameras(chunk):
-    print(f"\nStep 3: Aligning RGB+MS cameras...")
+    log.info(f"\nStep 3: Aligning RGB+MS cameras...")
     chunk.alignCameras(adaptive_fitting=False)
     aligned_cameras = len([cam for cam in chunk.cameras if cam.transform])
     total_cameras = len(chunk.cameras)
     alignment_ratio = aligned_cameras / total_cameras if total_cameras > 0 else 0
-    print(f"RGB+MS camera alignment completed: {aligned_cameras}/{total_cameras} cameras aligned ({alignment_ratio:.1%})")
+    log.info(f"RGB+MS camera alignment completed: {aligned_cameras}/{total_cameras} cameras aligned ({alignment_ratio:.1%})")
     if aligned_cameras == 0:
-        print("ERROR: No cameras aligned! Cannot proceed with processing.")
+        log.error("ERROR: No cameras aligned! Cannot proceed with processing.")
         return False
-    if chunk.markers:
-        enabled_markers = sum(1 for marker in chunk.markers if marker.reference.enabled)
-        print(f"GCP markers: {enabled_markers} enabled for alignment, {len(chunk.markers) - enabled_markers} as check points")
+    total_markers, enabled_markers, _, _ = _marker_stats(chunk, with_projections=False)
+    if total_markers:
+        log.info(f"GCP markers: {enabled_markers} enabled for alignment, {total_markers - enabled_markers} as check points")
     return True
 
 def build_depth_maps(chunk):
-    print(f"\nStep 4: Building depth maps...")
-    print("  Settings: Quality=Medium (4), Filter=MildFiltering, Max neighbors=16")
+    log.info(f"\nStep 4: Building depth maps...")
+    log.info("  Settings: Quality=Medium (4), Filter=MildFiltering, Max neighbors=16")
     chunk.buildDepthMaps(downscale=4, filter_mode=Metashape.FilterMode.MildFiltering, max_neighbors=16)
-    print("Depth maps completed successfully")
+    log.info("Depth maps completed successfully")
     return True
 
 def generate_point_cloud(chunk):
-    print(f"\nStep 5: Building point cloud...")
-    print("  Settings: Source=Depth maps, Point colors=True, Spacing=0.1m")
+    log.info(f"\nStep 5: Building point cloud...")
+    log.info("  Settings: Source=Depth maps, Point colors=True, Spacing=0.1m")
     chunk.buildPointCloud(source_data=Metashape.DataSource.DepthMapsData, point_colors=True, points_spacing=0.1)
     if chunk.point_cloud:
         point_count = chunk.point_cloud.point_count
-        print(f"Point cloud completed: {point_count:,} points generated")
+        log.info(f"Point cloud completed: {point_count:,} points generated")
         return True
     else:
-        print("WARNING: No point cloud was generated!")
+        log.warning("WARNING: No point cloud was generated!")
         return False
 
 def generate_processing_report(chunk, project_path, route_numbers):
-    print(f"\nStep 6: Generating processing report...")
+    log.info(f"\nStep 6: Generating processing report...")
     route_list = "_".join(route_numbers)
     report_path = os.path.join(os.path.dirname(project_path), f"processing_report_combined_routes_{route_list}_RGB_MS.pdf")
     chunk.exportReport(report_path)
-    print(f"Report saved: {report_path}")
+    log.info(f"Report saved: {report_path}")
     return report_path
 
-def process_combined_routes(route_numbers=None, dcim_path=None, gcp_path=None, output_path=None):
+def process_combined_routes(route_numbers=None, dcim_path=None, gcp_path=None, output_path=None, checkpoint=False):
+    # checkpoint=True saves the full project after every processing step (slower, more crash-resilient);
+    # by default the project is saved after import, on failure, and once at the end
     if route_numbers is None: route_numbers = routes_to_combine
     if dcim_path is None: dcim_path = dcim_base_path
     if gcp_path is None: gcp_path = output_path
@@ -466,33 +597,33 @@ def process_combined_routes(route_numbers=None, dcim_path=None, gcp_path=None, o
     
     # Validate configuration
     if not dcim_path or not gcp_path or not output_path or not route_numbers:
-        print("ERROR: Configuration incomplete!")
-        print("Please use configure_paths() and configure_routes() first")
+        log.error("ERROR: Configuration incomplete!")
+        log.info("Please use configure_paths() and configure_routes() first")
         return False
     
-    print("METASHAPE RGB+MS MULTI-ROUTE COMBINATION - GENERIC VERSION")
-    print("=" * 60)
-    print(f"Routes to combine: {', '.join(route_numbers)}")
-    print(f"DCIM path: {dcim_path}")
-    print(f"GCP path: {gcp_path}")
-    print(f"Output path: {output_path}")
-    print("=" * 60)
+    log.info("METASHAPE RGB+MS MULTI-ROUTE COMBINATION - GENERIC VERSION")
+    log.info("=" * 60)
+    log.info(f"Routes to combine: {', '.join(route_numbers)}")
+    log.info(f"DCIM path: {dcim_path}")
+    log.info(f"GCP path: {gcp_path}")
+    log.info(f"Output path: {output_path}")
+    log.info("=" * 60)
     try:
-        print(f"\nStep 0: Finding and validating RGB+MS routes...")
+        log.info(f"\nStep 0: Finding and validating RGB+MS routes...")
         found_routes = find_routes_by_numbers(route_numbers, dcim_path)
         if not found_routes:
-            print("RGB+MS route discovery failed!")
+            log.error("RGB+MS route discovery failed!")
             return False
         valid_routes = validate_routes_and_gcps(found_routes, gcp_path)
         if not valid_routes:
-            print("RGB+MS route validation failed!")
+            log.error("RGB+MS route validation failed!")
             return False
         
         # Diagnose dataset compatibility
         diagnose_datasets(valid_routes)
         project_path, project_full_path = create_combined_project_structure(output_path, route_numbers)
-        print(f"\nProject will be saved to: {project_full_path}")
-        print(f"\nStep 1: Importing {len(valid_routes)} RGB+MS routes as separate chunks...")
+        log.info(f"\nProject will be saved to: {project_full_path}")
+        log.info(f"\nStep 1: Importing {len(valid_routes)} RGB+MS routes as separate chunks...")
         doc = Metashape.Document()
         imported_chunks = []
         total_imported_markers = 0
@@ -504,109 +635,114 @@ def process_combined_routes(route_numbers=None, dcim_path=None, gcp_path=None, o
                 total_imported_markers += imported_count
                 total_enabled_markers += enabled_count
             except Exception as e:
-                print(f"ERROR importing RGB+MS Route {route['route_number']}: {str(e)}")
-                print("Stopping processing due to route import failure.")
+                log.error(f"ERROR importing RGB+MS Route {route.route_number}: {str(e)}")
+                log.error("Stopping processing due to route import failure.")
                 return False
-        print(f"\nSuccessfully imported {len(imported_chunks)} RGB+MS routes")
-        print(f"   Total markers imported: {total_imported_markers}")
-        print(f"   Total enabled markers: {total_enabled_markers}")
+        log.info(f"\nSuccessfully imported {len(imported_chunks)} RGB+MS routes")
+        log.info(f"   Total markers imported: {total_imported_markers}")
+        log.info(f"   Total enabled markers: {total_enabled_markers}")
         doc.save(project_full_path)
-        print(f"Project saved after RGB+MS route import")
-        print(f"\nStep 1.5: Merging RGB+MS chunks into single dataset...")
+        log.info(f"Project saved after RGB+MS route import")
+        log.info(f"\nStep 1.5: Merging RGB+MS chunks into single dataset...")
         try:
             merged_chunk = merge_chunks_with_validation(doc, imported_chunks)
         except Exception as e:
-            print(f"ERROR during RGB+MS chunk merge: {str(e)}")
-            print("Stopping processing due to merge failure.")
+            log.error(f"ERROR during RGB+MS chunk merge: {str(e)}")
+            log.error("Stopping processing due to merge failure.")
             return False
-        doc.save(project_full_path)
-        print(f"Project saved after RGB+MS chunk merge")
+        if checkpoint:
+            doc.save(project_full_path)
+            log.info(f"Project saved after RGB+MS chunk merge")
         
         # Debug: Check merged chunk state
-        print(f"\nDEBUG: Merged RGB+MS chunk analysis:")
-        print(f"  Total cameras: {len(merged_chunk.cameras)}")
-        print(f"  Total markers: {len(merged_chunk.markers)}")
-        print(f"  Enabled markers: {sum(1 for m in merged_chunk.markers if m.reference.enabled)}")
-        print(f"  Coordinate system: {merged_chunk.crs}")
+        log.info(f"\nDEBUG: Merged RGB+MS chunk analysis:")
+        log.info(f"  Total cameras: {len(merged_chunk.cameras)}")
+        merged_markers, merged_enabled, _, _ = _marker_stats(merged_chunk, with_projections=False)
+        log.info(f"  Total markers: {merged_markers}")
+        log.info(f"  Enabled markers: {merged_enabled}")
+        log.info(f"  Coordinate system: {merged_chunk.crs}")
         cameras_with_gps = sum(1 for cam in merged_chunk.cameras if cam.reference and cam.reference.location)
-        print(f"  Cameras with GPS: {cameras_with_gps}/{len(merged_chunk.cameras)}")
+        log.info(f"  Cameras with GPS: {cameras_with_gps}/{len(merged_chunk.cameras)}")
         
-        print(f"\nStarting standard processing workflow on merged RGB+MS dataset...")
+        log.info(f"\nStarting standard processing workflow on merged RGB+MS dataset...")
         if not match_photos(merged_chunk):
-            print("RGB+MS photo matching failed!")
+            log.error("RGB+MS photo matching failed!")
             doc.save(project_full_path)
             return False
-        doc.save(project_full_path)
-        print("Project saved after RGB+MS photo matching")
+        if checkpoint:
+            doc.save(project_full_path)
+            log.info("Project saved after RGB+MS photo matching")
         if not align_cameras(merged_chunk):
-            print("RGB+MS camera alignment failed!")
+            log.error("RGB+MS camera alignment failed!")
             doc.save(project_full_path)
             return False
-        doc.save(project_full_path)
-        print("Project saved after RGB+MS camera alignment")
+        if checkpoint:
+            doc.save(project_full_path)
+            log.info("Project saved after RGB+MS camera alignment")
         if not build_depth_maps(merged_chunk):
-            print("Depth map generation failed!")
+            log.error("Depth map generation failed!")
             doc.save(project_full_path)
             return False
-        doc.save(project_full_path)
-        print("Project saved after depth map generation")
+        if checkpoint:
+            doc.save(project_full_path)
+            log.info("Project saved after depth map generation")
         if not generate_point_cloud(merged_chunk):
-            print("Point cloud generation failed!")
+            log.error("Point cloud generation failed!")
             doc.save(project_full_path)
             return False
-        doc.save(project_full_path)
-        print("Project saved after point cloud generation")
+        if checkpoint:
+            doc.save(project_full_path)
+            log.info("Project saved after point cloud generation")
         report_path = generate_processing_report(merged_chunk, project_full_path, route_numbers)
-        print(f"\nStep 7: Final project save...")
+        log.info(f"\nStep 7: Final project save...")
         save_success = enhanced_save_project(doc, merged_chunk, project_full_path, "final RGB+MS processing")
         if not save_success:
-            print("ERROR: Failed to save final project!")
+            log.error("ERROR: Failed to save final project!")
             return False
         final_cameras = len(merged_chunk.cameras)
-        final_markers = len(merged_chunk.markers)
-        final_enabled = sum(1 for marker in merged_chunk.markers if marker.reference.enabled)
+        final_markers, final_enabled, _, _ = _marker_stats(merged_chunk, with_projections=False)
         final_points = merged_chunk.point_cloud.point_count if merged_chunk.point_cloud else 0
-        print(f"\n{'='*60}")
-        print(f"SUCCESS: Combined RGB+MS route processing completed!")
-        print(f"{'='*60}")
-        print(f"Input routes: {', '.join(route_numbers)}")
-        print(f"Final cameras: {final_cameras}")
-        print(f"Final markers: {final_markers} ({final_enabled} enabled, {final_markers-final_enabled} check points)")
-        print(f"Point cloud: {final_points:,} points")
-        print(f"Project: {project_full_path}")
-        print(f"Report: {report_path}")
-        print(f"{'='*60}")
+        log.info(f"\n{'='*60}")
+        log.info(f"SUCCESS: Combined RGB+MS route processing completed!")
+        log.info(f"{'='*60}")
+        log.info(f"Input routes: {', '.join(route_numbers)}")
+        log.info(f"Final cameras: {final_cameras}")
+        log.info(f"Final markers: {final_markers} ({final_enabled} enabled, {final_markers-final_enabled} check points)")
+        log.info(f"Point cloud: {final_points:,} points")
+        log.info(f"Project: {project_full_path}")
+        log.info(f"Report: {report_path}")
+        log.info(f"{'='*60}")
         return True
     except Exception as e:
-        print(f"\nFATAL ERROR during RGB+MS processing: {str(e)}")
-        print("Processing failed!")
+        log.error(f"\nFATAL ERROR during RGB+MS processing: {str(e)}")
+        log.error("Processing failed!")
         return False
 
 def show_available_routes():
     validate_configuration()
-    print("\nSCANNING FOR AVAILABLE RGB+MS ROUTES")
-    print("=" * 50)
+    log.info("\nSCANNING FOR AVAILABLE RGB+MS ROUTES")
+    log.info("=" * 50)
     routes = scan_dcim_folders_combined(dcim_base_path)
     if not routes:
-        print("No RGB+MS routes found!")
+        log.info("No RGB+MS routes found!")
         return []
-    print(f"Found {len(routes)} RGB+MS routes:")
+    log.info(f"Found {len(routes)} RGB+MS routes:")
     for route in routes:
-        gcp_path = get_gcp_file_path(route['route_number'], gcp_base_path)
+        gcp_path = get_gcp_file_path(route.route_number, gcp_base_path)
         gcp_exists = os.path.exists(gcp_path)
         gcp_status = "OK" if gcp_exists else "MISSING"
-        print(f"  Route {route['route_number']}: {route['rgb_count']} RGB + {route['ms_count']} MS = {route['total_count']} total, GCP: {gcp_status}")
-    print("=" * 50)
+        log.info(f"  Route {route.route_number}: {route.rgb_count} RGB + {route.ms_count} MS = {route.total_count} total, GCP: {gcp_status}")
+    log.info("=" * 50)
     return routes
 
 def show_current_configuration():
-    print("\nCURRENT RGB+MS CONFIGURATION")
-    print("=" * 50)
-    print(f"DCIM Base Path: {dcim_base_path}")
-    print(f"GCP Base Path: {gcp_base_path}")
-    print(f"Output Path: {output_base_path}")
-    print(f"Routes to Combine: {', '.join(routes_to_combine) if routes_to_combine else 'Not configured'}")
-    print("=" * 50)
+    log.info("\nCURRENT RGB+MS CONFIGURATION")
+    log.info("=" * 50)
+    log.info(f"DCIM Base Path: {dcim_base_path}")
+    log.info(f"GCP Base Path: {gcp_base_path}")
+    log.info(f"Output Path: {output_base_path}")
+    log.info(f"Routes to Combine: {', '.join(routes_to_combine) if routes_to_combine else 'Not configured'}")
+    log.info("=" * 50)
 
 def run_combined_rgb_ms_automation():
     validate_configuration()
@@ -614,8 +750,8 @@ def run_combined_rgb_ms_automation():
 
 def quick_diagnosis():
     validate_configuration()
-    print("QUICK DIAGNOSIS OF RGB+MS ROUTES TO COMBINE")
-    print("=" * 50)
+    log.info("QUICK DIAGNOSIS OF RGB+MS ROUTES TO COMBINE")
+    log.info("=" * 50)
     found_routes = find_routes_by_numbers(routes_to_combine, dcim_base_path)
     if found_routes:
         valid_routes = validate_routes_and_gcps(found_routes, gcp_base_path)
@@ -624,16 +760,16 @@ def quick_diagnosis():
             return True
     return False
 
-print("RGB+MS MULTI-ROUTE COMBINED AUTOMATION SCRIPT LOADED - GENERIC VERSION")
-print("=" * 70)
-print("CONFIGURATION REQUIRED:")
-print("1. configure_paths(dcim=r'YOUR_DCIM_PATH', gcp=r'YOUR_GCP_PATH', output=r'YOUR_OUTPUT_PATH')")
-print("2. configure_routes(['001', '002'])  # or your route numbers")
-print("")
-print("USAGE:")
-print("3. show_available_routes()  # optional: see what's available")
-print("4. quick_diagnosis()  # optional: check RGB+MS compatibility before processing")
-print("5. run_combined_rgb_ms_automation()")
-print("")
-print("Current configuration:")
+log.info("RGB+MS MULTI-ROUTE COMBINED AUTOMATION SCRIPT LOADED - GENERIC VERSION")
+log.info("=" * 70)
+log.info("CONFIGURATION REQUIRED:")
+log.info("1. configure_paths(dcim=r'YOUR_DCIM_PATH', gcp=r'YOUR_GCP_PATH', output=r'YOUR_OUTPUT_PATH')")
+log.info("2. configure_routes(['001', '002'])  # or your route numbers")
+log.info("")
+log.info("USAGE:")
+log.info("3. show_available_routes()  # optional: see what's available")
+log.info("4. quick_diagnosis()  # optional: check RGB+MS compatibility before processing")
+log.info("5. run_combined_rgb_ms_automation()")
+log.info("")
+log.info("Current configuration:")
 show_current_configuration()
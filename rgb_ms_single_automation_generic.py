@@ -10,63 +10,110 @@ exec(open(r'path\\to\\combined_automation_generic.py', encoding='utf-8').read())
 
 import os
 import re
+import sys
+import gc
+import json
+import logging
+import subprocess
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import Metashape
 
+# Route folder names: DJI_<timestamp>_<route number>_<name> or route_<number>
+_DJI_RE = re.compile(r'^DJI_\d{12,14}_(\d{3})_')
+_ROUTE_RE = re.compile(r'^route_(\d+)')
+
+# File extensions (lower case, without dot) considered when scanning route folders
+_IMAGE_EXTENSIONS = {'jpg', 'tif', 'tiff'}
+
+# Images of one route as returned by scan_dcim_folders_combined
+RouteImages = namedtuple("RouteImages", "route_number rgb_images ms_images dcim_path")
+
+# Command-line flag that makes the script run a single route as a parallel worker
+WORKER_FLAG = '--route-worker'
+
+# Processing log: full detail goes to processing.log in each route's project folder,
+# only warnings and errors are written to the (slow) Metashape console
+_LOG = logging.getLogger("combined")
+_LOG.setLevel(logging.INFO)
+_LOG.propagate = False
+if not _LOG.handlers:  # the script may be exec()'d more than once in the same console
+    _console_handler = logging.StreamHandler(sys.stdout)
+    _console_handler.setLevel(logging.WARNING)
+    _LOG.addHandler(_console_handler)
+
 def enhanced_save_project(doc, chunk, project_path, step_name=""):
     """Enhanced save function that ensures all products are stored"""
     try:
-        print(f"Saving project{' after ' + step_name if step_name else ''}...")
+        _LOG.info(f"Saving project{' after ' + step_name if step_name else ''}...")
         
         # Ensure chunk is in document
         if chunk not in doc.chunks:
-            print("WARNING: Chunk not in document, adding it...")
+            _LOG.warning("WARNING: Chunk not in document, adding it...")
             doc.append(chunk)
         
         # Save with explicit chunk specification
         doc.save(project_path, chunks=[chunk], archive=True)
         
-        print(f"Project saved successfully{' after ' + step_name if step_name else ''}")
+        _LOG.info(f"Project saved successfully{' after ' + step_name if step_name else ''}")
         return True
         
     except Exception as e:
-        print(f"ERROR saving project{' after ' + step_name if step_name else ''}: {str(e)}")
+        _LOG.error(f"ERROR saving project{' after ' + step_name if step_name else ''}: {str(e)}")
         try:
             # Fallback: try without chunks parameter
             doc.save(project_path)
-            print("Fallback save successful")
+            _LOG.info("Fallback save successful")
             return True
         except Exception as e2:
-            print(f"Fallback save also failed: {str(e2)}")
+            _LOG.error(f"Fallback save also failed: {str(e2)}")
             return False
 
-def verify_saved_products(project_path):
-    """Verify that all products are properly saved in the project file"""
+def verify_saved_products(project_path, chunk=None, cold=False, require_point_cloud=True):
+    """Verify that all products are properly saved in the project file
+    
+    When the live chunk is passed it is checked directly; the saved project
+    is only re-opened from disk without a chunk or with cold=True.
+    With require_point_cloud=False the point cloud is not treated as critical
+    (it was exported and then released from the project).
+    """
     try:
-        print("Verifying saved products...")
-        
-        # Open project in read-only mode to verify
-        test_doc = Metashape.Document()
-        test_doc.open(project_path)
+        test_doc = None
+        if chunk is not None and not cold:
+            _LOG.info("Verifying saved products (live chunk)...")
+            test_chunk = chunk
+        else:
+            _LOG.info("Verifying saved products...")
+            
+            # Open project in read-only mode to verify
+            test_doc = Metashape.Document()
+            test_doc.open(project_path)
+            
+            if not test_doc.chunks:
+                _LOG.error("❌ No chunks found in saved project")
+                test_doc = None  # Close document
+                return False
+                
+            test_chunk = test_doc.chunks[0]
         
-        if not test_doc.chunks:
-            print("❌ No chunks found in saved project")
-            test_doc = None  # Close document
+        # Critical products first: stop at the first one missing
+        cams = test_chunk.cameras or ()  # fetch the camera container once
+        aligned_cameras = sum(1 for cam in cams if cam.transform is not None)
+        if aligned_cameras == 0:
+            _LOG.error("❌ Critical product missing from saved project: Camera alignment")
+            return False
+        point_cloud = test_chunk.point_cloud
+        point_count = point_cloud.point_count if point_cloud else 0
+        if require_point_cloud and point_count == 0:
+            _LOG.error("❌ Critical product missing from saved project: Point cloud")
             return False
-            
-        test_chunk = test_doc.chunks[0]
         
-        # Check for each product
-        products_found = []
+        # Status of the remaining products (reported only)
+        products_found = [f"Camera alignment ({aligned_cameras}/{len(cams)})"]
         products_missing = []
         
-        # Check cameras and alignment
-        aligned_cameras = len([cam for cam in test_chunk.cameras if cam.transform]) if test_chunk.cameras else 0
-        total_cameras = len(test_chunk.cameras) if test_chunk.cameras else 0
-        if aligned_cameras > 0:
-            products_found.append(f"Camera alignment ({aligned_cameras}/{total_cameras})")
-        else:
-            products_missing.append("Camera alignment")
-            
         # Check tie points
         if test_chunk.tie_points and test_chunk.tie_points.point_count > 0:
             products_found.append(f"Tie points ({test_chunk.tie_points.point_count})")
@@ -74,14 +121,15 @@ def verify_saved_products(project_path):
             products_missing.append("Tie points")
             
         # Check point cloud
-        if test_chunk.point_cloud and test_chunk.point_cloud.point_count > 0:
-            products_found.append(f"Point cloud ({test_chunk.point_cloud.point_count:,} points)")
+        if point_count > 0:
+            products_found.append(f"Point cloud ({point_count:,} points)")
         else:
             products_missing.append("Point cloud")
             
         # Check depth maps
-        if test_chunk.depth_maps and len(test_chunk.depth_maps.keys()) > 0:
-            products_found.append(f"Depth maps ({len(test_chunk.depth_maps.keys())} cameras)")
+        depth_map_count = len(test_chunk.depth_maps.keys()) if test_chunk.depth_maps else 0
+        if depth_map_count > 0:
+            products_found.append(f"Depth maps ({depth_map_count} cameras)")
         else:
             products_missing.append("Depth maps")
             
@@ -92,254 +140,453 @@ def verify_saved_products(project_path):
             products_missing.append("GCP markers")
         
         # Report results
-        if products_found:
-            print("✅ Products found in saved project:")
-            for product in products_found:
-                print(f"   ✅ {product}")
+        _LOG.info("✅ Products found in saved project:")
+        for product in products_found:
+            _LOG.info(f"   ✅ {product}")
                 
         if products_missing:
-            print("❌ Products missing from saved project:")
+            _LOG.warning("❌ Products missing from saved project:")
             for product in products_missing:
-                print(f"   ❌ {product}")
+                _LOG.warning(f"   ❌ {product}")
         
-        # Close test document
-        test_doc = None
-        
-        # Return success if critical products exist
-        critical_products = ["Camera alignment", "Point cloud"]
-        critical_missing = [p for p in products_missing if any(cp in p for cp in critical_products)]
-        
-        if not critical_missing:
-            print("✅ All critical products verified in saved project")
-            return True
-        else:
-            print("❌ Critical products missing from saved project")
-            return False
+        _LOG.info("✅ All critical products verified in saved project")
+        return True
             
     except Exception as e:
-        print(f"❌ Error verifying saved products: {str(e)}")
+        _LOG.error(f"❌ Error verifying saved products: {str(e)}")
         return False
 
-def create_project_structure(base_path, route_name):
-    """Create project folder structure with automatic versioning"""
+def create_project_structure(base_path, route_name, reuse_latest=False):
+    """Create project folder structure with automatic versioning
+    
+    With reuse_latest=True the most recent existing version is returned instead
+    of creating a new one (used to resume an interrupted run).
+    """
     base_project_name = f"route_{route_name}_Combined"
     version = 1
     
+    # Read the existing names once instead of probing each version on disk
+    try:
+        with os.scandir(base_path) as it:
+            existing = {entry.name for entry in it}
+    except FileNotFoundError:
+        os.makedirs(base_path, exist_ok=True)
+        existing = set()
+    
     # Check for existing versions and increment
-    while True:
-        if version == 1:
-            project_folder_name = base_project_name
-        else:
-            project_folder_name = f"{base_project_name}_v{version}"
-        
-        project_folder = os.path.join(base_path, project_folder_name)
-        
-        if not os.path.exists(project_folder):
-            break
+    project_folder_name = base_project_name
+    while project_folder_name in existing:
         version += 1
+        project_folder_name = f"{base_project_name}_v{version}"
+    if reuse_latest and version > 1:
+        project_folder_name = base_project_name if version == 2 else f"{base_project_name}_v{version - 1}"
+    project_folder = os.path.join(base_path, project_folder_name)
     
     # Create the project folder and subfolders
     os.makedirs(project_folder, exist_ok=True)
     
-    subfolders = ['orthomosaic', 'dem', 'pointcloud', 'report']
-    for subfolder in subfolders:
-        os.makedirs(os.path.join(project_folder, subfolder), exist_ok=True)
+    # Parent exists now, so a plain mkdir per subfolder is enough
+    for subfolder in ('orthomosaic', 'dem', 'pointcloud', 'report'):
+        try:
+            os.mkdir(os.path.join(project_folder, subfolder))
+        except FileExistsError:
+            pass
     
     return project_folder, project_folder_name
 
+def _iter_dcim(path, route_number=None, is_route_folder=False):
+    """Yield (folder, route number, image entries) for route folders below path"""
+    subdirs = []
+    image_entries = []
+    has_dji_subdir = False
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    has_dji_subdir = has_dji_subdir or 'DJI_' in name
+                    if not entry.is_symlink():
+                        subdirs.append(entry)
+                elif name.rpartition('.')[2].lower() in _IMAGE_EXTENSIONS:
+                    image_entries.append(entry)
+    except OSError:
+        return
+    
+    if route_number is not None and ('DCIM' in path or has_dji_subdir):
+        yield path, route_number, image_entries
+    
+    # DJI capture folders hold the images themselves; nothing to find below them
+    if is_route_folder:
+        return
+    
+    for entry in subdirs:
+        if route_number is not None:
+            # Route already fixed by an ancestor folder (e.g. route_N/DCIM/...)
+            yield from _iter_dcim(entry.path, route_number)
+            continue
+        dji_match = _DJI_RE.match(entry.name)
+        route_match = dji_match or _ROUTE_RE.match(entry.name)
+        if route_match:
+            yield from _iter_dcim(entry.path, route_match.group(1), is_route_folder=dji_match is not None)
+        else:
+            yield from _iter_dcim(entry.path)
+
 def scan_dcim_folders_combined(base_path):
-    """Scan for both RGB (JPG) and MS (TIF) images in DCIM folders"""
+    """Scan for both RGB (JPG) and MS (TIF) images in DCIM folders
+    
+    Returns a list of RouteImages sorted by route number.
+    """
     dcim_folders = {}
     
-    for root, dirs, files in os.walk(base_path):
-        if 'DCIM' in root or any('DJI_' in d for d in dirs):
-            # Extract route identifier from path or folder names
-            path_parts = root.replace('\\', '/').split('/')
-            route_match = None
-            
-            # Look for route pattern in folder names
-            for part in path_parts:
-                if re.match(r'^DJI_\d{12,14}_(\d{3})_.*', part):
-                    route_match = re.search(r'DJI_\d{12,14}_(\d{3})_.*', part)
-                    break
-                elif re.match(r'^route_\d+', part):
-                    route_match = re.search(r'route_(\d+)', part)
-                    break
-            
-            if route_match:
-                route_number = route_match.group(1)
-                
-                if route_number not in dcim_folders:
-                    dcim_folders[route_number] = {'rgb_images': [], 'ms_images': [], 'dcim_path': root}
-                
-                # Collect RGB images (JPG with 'D' identifier)
-                rgb_images = [f for f in files if f.lower().endswith('.jpg') and ('D' in f.upper() or 'RGB' in f.upper())]
-                dcim_folders[route_number]['rgb_images'].extend([os.path.join(root, f) for f in rgb_images])
-                
-                # Collect MS images (TIF files)
-                ms_images = [f for f in files if (f.lower().endswith('.tif') or f.lower().endswith('.tiff')) and 'MS' in f.upper()]
-                dcim_folders[route_number]['ms_images'].extend([os.path.join(root, f) for f in ms_images])
+    # A route folder may already be part of base_path itself
+    base_route = None
+    for part in os.path.normpath(base_path).split(os.sep):
+        route_match = _DJI_RE.match(part) or _ROUTE_RE.match(part)
+        if route_match:
+            base_route = route_match.group(1)
+            break
+    
+    for root, route_number, image_entries in _iter_dcim(base_path, base_route):
+        route = dcim_folders.get(route_number)
+        if route is None:
+            route = dcim_folders[route_number] = RouteImages(route_number, [], [], root)
+        rgb_list = route.rgb_images
+        ms_list = route.ms_images
+        
+        # Single pass: RGB images are JPGs with 'D' or 'RGB' in the name, MS images are TIFs with 'MS'
+        for entry in image_entries:
+            name_lower = entry.name.lower()
+            if name_lower.endswith('.jpg'):
+                name_upper = entry.name.upper()
+                if 'D' in name_upper or 'RGB' in name_upper:
+                    rgb_list.append(entry.path)
+            elif name_lower.endswith(('.tif', '.tiff')):
+                if 'MS' in entry.name.upper():
+                    ms_list.append(entry.path)
     
-    return dcim_folders
+    return sorted(dcim_folders.values(), key=lambda route: int(route.route_number))
+
+def _sensor_sort_key(image_path):
+    """Sort key grouping images by sensor (D, MS_G, MS_NIR, ...) and then capture time
+    
+    DJI names are DJI_<timestamp>_<index>_<sensor>.<ext>, so the file name
+    itself orders images by capture time within a sensor.
+    """
+    name = os.path.basename(image_path)
+    return os.path.splitext(name)[0].rsplit('_', 1)[-1].upper(), name
 
 def import_gcps_from_xml(chunk, gcp_file_path):
-    """Import GCPs from XML file using Metashape's built-in function"""
-    if not os.path.exists(gcp_file_path):
-        print(f"Warning: GCP file not found: {gcp_file_path}")
+    """Import GCPs from XML file using Metashape's built-in function
+    
+    gcp_file_path is None when the route has no GCP file (checked by the caller).
+    """
+    if gcp_file_path is None:
+        _LOG.warning("Warning: No GCP file for this route - processing without GCPs")
         return False
     
     try:
         # Use Metashape's importMarkers method for XML marker files
         chunk.importMarkers(path=gcp_file_path)
         
-        # Count imported markers
-        imported_count = len(chunk.markers)
-        enabled_count = sum(1 for marker in chunk.markers if marker.reference.enabled)
-        
-        print(f"Successfully imported {imported_count} GCP markers with pixel coordinates")
-        print(f"Active GCPs: {enabled_count} (enabled markers for alignment)")
-        print(f"Check Points: {imported_count - enabled_count} (disabled markers for accuracy validation)")
+        # Read each marker once: enabled flag and projection count (pixel coordinates in images)
+        markers = chunk.markers  # local ref: one container fetch from Metashape
+        marker_details = []
+        enabled_count = 0
+        for marker in markers:
+            enabled = marker.reference.enabled
+            if enabled:
+                enabled_count += 1
+            # Only cameras that have a projection are keyed
+            marker_details.append((marker.label, len(marker.projections.keys()), enabled))
+        imported_count = len(marker_details)
+        
+        _LOG.info(f"Successfully imported {imported_count} GCP markers with pixel coordinates")
+        _LOG.info(f"Active GCPs: {enabled_count} (enabled markers for alignment)")
+        _LOG.info(f"Check Points: {imported_count - enabled_count} (disabled markers for accuracy validation)")
         
         # Show marker details
-        for marker in chunk.markers:
-            # Count projections (pixel coordinates in images)
-            projections = sum(1 for camera in chunk.cameras if marker.projections[camera])
-            enabled_status = "[ENABLED]" if marker.reference.enabled else "[DISABLED]"
-            print(f"  {marker.label}: {projections} image projections {enabled_status}")
+        for label, projections, enabled in marker_details:
+            enabled_status = "[ENABLED]" if enabled else "[DISABLED]"
+            _LOG.info(f"  {label}: {projections} image projections {enabled_status}")
         
         return True
     except Exception as e:
-        print(f"Error importing GCPs: {e}")
+        _LOG.error(f"Error importing GCPs: {e}")
         return False
 
-def process_combined_route(route_number, rgb_images, ms_images, project_folder, gcp_file_path):
-    """Process both RGB and MS images together in Multi-Camera system"""
-    
-    # Create new document and chunk
-    doc = Metashape.Document()
-    chunk = doc.addChunk()
-    chunk.label = f"Route_{route_number}_Combined"
-    
-    print(f"Processing Route {route_number} - Combined RGB+MS")
-    print(f"RGB images: {len(rgb_images)}")
-    print(f"MS images: {len(ms_images)}")
+@contextmanager
+def _gpu_lock(lock_path):
+    """Hold an OS-level file lock so only one worker process uses the GPU at a time"""
+    if not lock_path:
+        yield
+        return
+    with open(lock_path, 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 s; keep waiting
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def process_combined_route(route_number, rgb_images, ms_images, project_folder, gcp_file_path, gpu_lock=None, resume=False, match_downscale=2, max_neighbors=8,
+                           release_products=False, build_texture=True, texture_size=2048):
+    """Process both RGB and MS images together in Multi-Camera system (options as in process_combined_routes)"""
+    # Route log file, attached only while this route is being processed
+    file_handler = logging.FileHandler(os.path.join(project_folder, "processing.log"), encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    _LOG.addHandler(file_handler)
+    try:
+        return _process_combined_route(route_number, rgb_images, ms_images, project_folder, gcp_file_path,
+                                       gpu_lock=gpu_lock, resume=resume, match_downscale=match_downscale,
+                                       max_neighbors=max_neighbors, release_products=release_products,
+                                       build_texture=build_texture, texture_size=texture_size)
+    finally:
+        _LOG.removeHandler(file_handler)
+        file_handler.close()
+
+def _process_combined_route(route_number, rgb_images, ms_images, project_folder, gcp_file_path, gpu_lock=None, resume=False, match_downscale=2, max_neighbors=8,
+                            release_products=False, build_texture=True, texture_size=2048):
+    """Processing pipeline of process_combined_route, without the route log file handling"""
+    project_file = os.path.join(project_folder, f"route_{route_number}_combined.psx")
+    resuming = resume and os.path.exists(project_file)
     
-    # Combine all images for Multi-Camera system
-    all_images = rgb_images + ms_images
+    _LOG.info(f"Processing Route {route_number} - Combined RGB+MS")
+    _LOG.info(f"RGB images: {len(rgb_images)}")
+    _LOG.info(f"MS images: {len(ms_images)}")
     
     try:
-        # Add all photos as Multi-Camera system
-        chunk.addPhotos(all_images, layout=Metashape.MulticameraLayout)
-        print(f"Added {len(all_images)} photos as Multi-Camera system")
-        
-        # Save project after adding photos
-        project_file = os.path.join(project_folder, f"route_{route_number}_combined.psx")
-        doc.save(project_file, chunks=[chunk])
-        print(f"Project saved: {project_file}")
-        
-        # Import GCPs (will apply to RGB and propagate to MS)
-        if import_gcps_from_xml(chunk, gcp_file_path):
-            print("GCPs imported and applied to Multi-Camera system")
-        
-        # Set coordinate systems
-        chunk.crs = Metashape.CoordinateSystem("EPSG::4326")  # WGS84 for images
-        print("Coordinate system set to WGS84 (EPSG:4326)")
-        doc.save(project_file, chunks=[chunk])  # Save after setup
-        
-        # Align photos
-        print("Starting photo alignment...")
-        print("  Settings: Downscale=1 (full resolution), Generic preselection=True, Reference preselection=True")
-        chunk.matchPhotos(downscale=1, generic_preselection=True, reference_preselection=True)
-        chunk.alignCameras(adaptive_fitting=False)
-        doc.save(project_file, chunks=[chunk])  # Save after alignment
-        print("Photo alignment completed")
+        # Create new document and chunk, or re-open the previous run
+        doc = Metashape.Document()
+        if resuming:
+            # A crashed run may have left the project locked
+            doc.open(project_file, ignore_lock=True)
+            chunk = doc.chunk or (doc.chunks[0] if doc.chunks else None)
+            if chunk is None:
+                _LOG.error(f"ERROR: No chunks found in existing project: {project_file}")
+                return False
+            _LOG.info(f"Resuming from existing project: {project_file}")
+        else:
+            chunk = doc.addChunk()
+            chunk.label = f"Route_{route_number}_Combined"
+        
+        existing_cameras = len(chunk.cameras) if resuming else 0
+        if existing_cameras > 0:
+            _LOG.info(f"Photos, GCPs and coordinate system already set up ({existing_cameras} cameras) - skipping")
+        else:
+            # Combine all images for Multi-Camera system, grouped by sensor and in capture order
+            all_images = sorted(chain(rgb_images, ms_images), key=_sensor_sort_key)
+            
+            # Add all photos as Multi-Camera system
+            chunk.addPhotos(all_images, layout=Metashape.MulticameraLayout)
+            _LOG.info(f"Added {len(all_images)} photos as Multi-Camera system")
+            
+            # Import GCPs (will apply to RGB and propagate to MS)
+            if import_gcps_from_xml(chunk, gcp_file_path):
+                _LOG.info("GCPs imported and applied to Multi-Camera system")
+            
+            # Set coordinate systems
+            chunk.crs = Metashape.CoordinateSystem("EPSG::4326")  # WGS84 for images
+            _LOG.info("Coordinate system set to WGS84 (EPSG:4326)")
+            doc.save(project_file, chunks=[chunk])  # Save after setup (photos, GCPs, CRS)
+            _LOG.info(f"Project saved: {project_file}")
+        
+        if resuming and any(camera.transform for camera in chunk.cameras):
+            _LOG.info("Cameras already aligned - skipping photo alignment")
+        else:
+            # Align photos
+            _LOG.info("Starting photo alignment...")
+            _LOG.info(f"  Settings: Downscale={match_downscale}, Generic preselection=True, Reference preselection=Source, Keypoint limit=40000, Tie point limit=4000")
+            chunk.matchPhotos(downscale=match_downscale, generic_preselection=True, reference_preselection=True,
+                              reference_preselection_mode=Metashape.ReferencePreselectionSource,
+                              keypoint_limit=40000, tiepoint_limit=4000)
+            chunk.alignCameras(adaptive_fitting=False)
+            doc.save(project_file, chunks=[chunk], archive=False)  # Checkpoint after alignment
+            _LOG.info("Photo alignment completed")
         
         # Check alignment results
-        aligned_cameras = sum(1 for camera in chunk.cameras if camera.transform)
-        total_cameras = len(chunk.cameras)
+        cams = chunk.cameras  # fetch the camera container once
+        total_cameras = len(cams)
+        aligned_cameras = sum(1 for camera in cams if camera.transform is not None)
         alignment_ratio = aligned_cameras / total_cameras if total_cameras > 0 else 0
         
-        print(f"Camera alignment completed: {aligned_cameras}/{total_cameras} cameras aligned ({alignment_ratio:.1%})")
+        _LOG.info(f"Camera alignment completed: {aligned_cameras}/{total_cameras} cameras aligned ({alignment_ratio:.1%})")
         
         if aligned_cameras == 0:
-            print("ERROR: No cameras aligned successfully!")
+            _LOG.error("ERROR: No cameras aligned successfully!")
             return False
         
         # Build depth maps and point cloud
-        print("Building depth maps and point cloud...")
-        print("  Settings: Quality=Medium (4), Filter=MildFiltering, Point spacing=0.1m")
-        chunk.buildDepthMaps(downscale=4, filter_mode=Metashape.MildFiltering, max_neighbors=16)
-        chunk.buildPointCloud(source_data=Metashape.DataSource.DepthMapsData, point_colors=True, points_spacing=0.1)
-        doc.save(project_file, chunks=[chunk])  # Save after dense cloud
-        print("Point cloud completed")
+        if resuming and chunk.point_cloud and chunk.point_cloud.point_count > 0:
+            _LOG.info("Point cloud already built - skipping depth maps and point cloud")
+        else:
+            _LOG.info("Building depth maps and point cloud...")
+            _LOG.info(f"  Settings: Quality=Medium (4), Filter=MildFiltering, Max neighbors={max_neighbors}, Point spacing=0.1m")
+            with _gpu_lock(gpu_lock):
+                chunk.buildDepthMaps(downscale=4, filter_mode=Metashape.MildFiltering, max_neighbors=max_neighbors)
+            chunk.buildPointCloud(source_data=Metashape.DataSource.DepthMapsData, point_colors=True, points_spacing=0.1)
+            doc.save(project_file, chunks=[chunk], archive=False)  # Checkpoint after dense cloud
+            _LOG.info("Point cloud completed")
         
         # Build mesh
-        print("Building mesh...")
-        chunk.buildModel(surface_type=Metashape.Arbitrary, interpolation=Metashape.EnabledInterpolation)
-        doc.save(project_file, chunks=[chunk])  # Save after mesh
-        print("Mesh completed")
+        if resuming and chunk.model:
+            _LOG.info("Mesh already built - skipping")
+        else:
+            _LOG.info("Building mesh...")
+            chunk.buildModel(surface_type=Metashape.Arbitrary, interpolation=Metashape.EnabledInterpolation)
+            _LOG.info("Mesh completed")
         
         # Build texture
-        print("Building texture...")
-        chunk.buildTexture(blending_mode=Metashape.MosaicBlending, texture_size=4096)
-        doc.save(project_file, chunks=[chunk])  # Save after texture
-        print("Texture completed")
+        if not build_texture:
+            _LOG.info("Texture disabled - skipping")
+        elif resuming and chunk.model and getattr(chunk.model, 'textures', None):
+            _LOG.info("Texture already built - skipping")
+        else:
+            _LOG.info(f"Building texture ({texture_size}x{texture_size})...")
+            chunk.buildTexture(blending_mode=Metashape.MosaicBlending, texture_size=texture_size)
+            _LOG.info("Texture completed")
         
         # Build DEM
-        print("Building DEM...")
-        chunk.buildDem(source_data=Metashape.DenseCloudData)
-        doc.save(project_file, chunks=[chunk])  # Save after DEM
-        print("DEM completed")
+        if resuming and chunk.elevation:
+            _LOG.info("DEM already built - skipping")
+        else:
+            _LOG.info("Building DEM...")
+            chunk.buildDem(source_data=Metashape.DenseCloudData)
+            _LOG.info("DEM completed")
         
         # Build Orthomosaic
-        print("Building orthomosaic...")
-        chunk.buildOrthomosaic(surface_data=Metashape.ElevationData)
-        doc.save(project_file, chunks=[chunk])  # Save after orthomosaic
-        print("Orthomosaic completed")
+        if resuming and chunk.orthomosaic:
+            _LOG.info("Orthomosaic already built - skipping")
+        else:
+            _LOG.info("Building orthomosaic...")
+            chunk.buildOrthomosaic(surface_data=Metashape.ElevationData)
+            doc.save(project_file, chunks=[chunk], archive=False)  # Checkpoint after orthomosaic
+            _LOG.info("Orthomosaic completed")
         
         # Export products
-        print("Exporting products...")
+        _LOG.info("Exporting products...")
         
         # Export orthomosaic
         ortho_path = os.path.join(project_folder, "orthomosaic", f"route_{route_number}_combined_orthomosaic.tif")
         chunk.exportRaster(ortho_path, image_format=Metashape.ImageFormatTIFF)
-        print(f"Orthomosaic exported: {ortho_path}")
+        _LOG.info(f"Orthomosaic exported: {ortho_path}")
         
         # Export DEM
         dem_path = os.path.join(project_folder, "dem", f"route_{route_number}_combined_dem.tif")
         chunk.exportRaster(dem_path, source_data=Metashape.ElevationData, image_format=Metashape.ImageFormatTIFF)
-        print(f"DEM exported: {dem_path}")
+        _LOG.info(f"DEM exported: {dem_path}")
         
         # Export point cloud
         pc_path = os.path.join(project_folder, "pointcloud", f"route_{route_number}_combined_pointcloud.las")
         chunk.exportPoints(pc_path, source_data=Metashape.DenseCloudData, format=Metashape.PointsFormatLAS)
-        print(f"Point cloud exported: {pc_path}")
+        _LOG.info(f"Point cloud exported: {pc_path}")
         
         # Export processing report
         report_path = os.path.join(project_folder, "report", f"route_{route_number}_combined_report.pdf")
         chunk.exportReport(report_path)
-        print(f"Processing report exported: {report_path}")
+        _LOG.info(f"Processing report exported: {report_path}")
+        
+        if release_products:
+            # Everything is exported and reported, so keep the final save and verification small
+            chunk.orthomosaic = None
+            chunk.point_cloud = None
+            chunk.model = None
+            _LOG.info("Released orthomosaic, mesh and point cloud from the project")
         
         # Final save with verification
         save_success = enhanced_save_project(doc, chunk, project_file, "final combined processing")
+        if release_products:
+            gc.collect()
         if not save_success:
-            print("ERROR: Failed to save final combined project!")
+            _LOG.error("ERROR: Failed to save final combined project!")
             return False
         
         # Verify all products are saved
-        verification_success = verify_saved_products(project_file)
+        verification_success = verify_saved_products(project_file, chunk, require_point_cloud=not release_products)
         if not verification_success:
-            print("WARNING: Combined product verification failed - some data may not be properly saved")
+            _LOG.warning("WARNING: Combined product verification failed - some data may not be properly saved")
         
-        print(f"Route {route_number} combined processing completed successfully!")
+        _LOG.info(f"Route {route_number} combined processing completed successfully!")
         return True
         
     except Exception as e:
-        print(f"Error processing route {route_number}: {e}")
+        _LOG.error(f"Error processing route {route_number}: {e}")
+        return False
+
+def _run_route_in_worker(job, script_path, metashape_exe):
+    """Process one route in a separate Metashape instance and report whether it succeeded"""
+    job_file = os.path.join(job['project_folder'], "worker_job.json")
+    result_file = os.path.join(job['project_folder'], "worker_result.json")
+    with open(job_file, 'w', encoding='utf-8') as f:
+        json.dump(job, f)
+    # A result left by an earlier run in the same (resumed) folder must not count
+    try:
+        os.remove(result_file)
+    except FileNotFoundError:
+        pass
+    print(f"Starting worker for route {job['route_number']}")
+    completed = subprocess.run([metashape_exe, '-r', script_path, WORKER_FLAG, job_file], check=False)
+    if completed.returncode != 0:
+        print(f"Worker for route {job['route_number']} exited with code {completed.returncode}")
+        return False
+    try:
+        with open(result_file, encoding='utf-8') as f:
+            return bool(json.load(f).get('success'))
+    except (OSError, ValueError):
         return False
 
-def process_combined_routes(dcim_path, output_path, gcp_path):
-    """Process all combined routes found in the specified paths"""
+def _route_worker_main(job_file):
+    """Entry point of a worker started by process_combined_routes(max_workers > 1)"""
+    success = False
+    try:
+        with open(job_file, encoding='utf-8') as f:
+            job = json.load(f)
+        success = process_combined_route(**job)
+    finally:
+        # Always quit, otherwise the parent waits forever on this instance
+        try:
+            with open(os.path.join(os.path.dirname(job_file), "worker_result.json"), 'w', encoding='utf-8') as f:
+                json.dump({'success': bool(success)}, f)
+        finally:
+            Metashape.app.quit()
+
+def process_combined_routes(dcim_path, output_path, gcp_path, max_workers=1, script_path=None, metashape_exe=None, resume=False,
+                            match_downscale=2, max_neighbors=8, release_products=False, build_texture=True, texture_size=2048):
+    """Process all combined routes found in the specified paths
+    
+    With resume=True the latest existing project folder of each route is re-used
+    and stages already completed by a previous run are skipped.
+    match_downscale: photo matching accuracy (0 = Highest, 1 = High, 2 = Medium).
+    max_neighbors: neighbour images per depth map.
+    release_products: drop orthomosaic, mesh and point cloud before the final save.
+    build_texture / texture_size: whether to texture the mesh, and at what size.
+    
+    With max_workers > 1, routes are processed in parallel, each in its own Metashape
+    instance started as `metashape_exe -r script_path` (script_path must point to this
+    file; metashape_exe defaults to the running executable). Depth map building, the
+    GPU-heavy step, is serialised across workers with a lock file in output_path.
+    """
+    if max_workers > 1:
+        script_path = script_path or globals().get('__file__')
+        metashape_exe = metashape_exe or sys.executable
+        if not script_path:
+            print("ERROR: script_path is required for parallel processing (path to this script)")
+            return False
+    
     print("METASHAPE COMBINED RGB+MS AUTOMATION")
     print("=" * 50)
     print(f"DCIM Path: {dcim_path}")
@@ -347,52 +594,94 @@ def process_combined_routes(dcim_path, output_path, gcp_path):
     print(f"GCP Path: {gcp_path}")
     
     # Scan for DCIM folders with both RGB and MS images
-    dcim_folders = scan_dcim_folders_combined(dcim_path)
+    routes = scan_dcim_folders_combined(dcim_path)
     
-    if not dcim_folders:
+    if not routes:
         print("No DCIM folders with images found!")
         return False
     
-    print(f"Found {len(dcim_folders)} routes with images:")
-    for route_number, data in dcim_folders.items():
-        print(f"  Route {route_number}: {len(data['rgb_images'])} RGB, {len(data['ms_images'])} MS images")
+    print(f"Found {len(routes)} routes with images:")
+    for route in routes:
+        print(f"  Route {route.route_number}: {len(route.rgb_images)} RGB, {len(route.ms_images)} MS images")
+    
+    # List the GCP folder once instead of checking each route's file on disk;
+    # keyed by lower-case name to match as case-insensitively as Windows does
+    gcp_files = {name.lower(): name for name in os.listdir(gcp_path)} if os.path.isdir(gcp_path) else {}
     
     successful = 0
     failed = 0
+    worker_jobs = []
     
-    # Process each route
-    for route_number, data in dcim_folders.items():
-        rgb_images = data['rgb_images']
-        ms_images = data['ms_images']
-        
+    # Process each route, largest first, so the expensive routes are not left to the end
+    routes_by_size = sorted(routes, key=lambda route: -(len(route.rgb_images) + len(route.ms_images)))
+    for route_number, rgb_images, ms_images, _ in routes_by_size:
         if not rgb_images and not ms_images:
             print(f"Skipping route {route_number}: No images found")
             continue
         
         # Create project structure with versioning
-        project_folder, project_name = create_project_structure(output_path, route_number)
-        print(f"Created project folder: {project_folder}")
+        project_folder, project_name = create_project_structure(output_path, route_number, reuse_latest=resume)
+        print(f"{'Using' if resume else 'Created'} project folder: {project_folder}")
         
         # Look for GCP file
-        gcp_file_path = os.path.join(gcp_path, f"gcp_route_{route_number}.xml")
+        gcp_file_name = f"gcp_route_{route_number}.xml"
+        if gcp_file_name.lower() in gcp_files:
+            gcp_file_path = os.path.join(gcp_path, gcp_files[gcp_file_name.lower()])
+        else:
+            gcp_file_path = None
+            print(f"Warning: GCP file not found: {os.path.join(gcp_path, gcp_file_name)}")
+        
+        if max_workers > 1:
+            worker_jobs.append({
+                'route_number': route_number,
+                'rgb_images': rgb_images,
+                'ms_images': ms_images,
+                'project_folder': project_folder,
+                'gcp_file_path': gcp_file_path,
+                'gpu_lock': os.path.join(output_path, ".gpu_depth_maps.lock"),
+                'resume': resume,
+                'match_downscale': match_downscale,
+                'max_neighbors': max_neighbors,
+                'release_products': release_products,
+                'build_texture': build_texture,
+                'texture_size': texture_size
+            })
+            continue
         
         # Process the route
-        success = process_combined_route(route_number, rgb_images, ms_images, project_folder, gcp_file_path)
+        success = process_combined_route(route_number, rgb_images, ms_images, project_folder, gcp_file_path, resume=resume,
+                                         match_downscale=match_downscale, max_neighbors=max_neighbors,
+                                         release_products=release_products, build_texture=build_texture,
+                                         texture_size=texture_size)
         
         if success:
             print(f"✓ Route {route_number} processed successfully")
             successful += 1
         else:
-            print(f"✗ Route {route_number} processing failed")
+            print(f"✗ Route {route_number} processing failed (see processing.log in {project_folder})")
             failed += 1
         
         print("-" * 50)
     
+    # Parallel mode: one Metashape instance per route, at most max_workers at a time
+    if worker_jobs:
+        print(f"Processing {len(worker_jobs)} routes with up to {max_workers} parallel Metashape workers...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda job: _run_route_in_worker(job, script_path, metashape_exe), worker_jobs))
+        for job, success in zip(worker_jobs, results):
+            if success:
+                print(f"✓ Route {job['route_number']} processed successfully")
+                successful += 1
+            else:
+                print(f"✗ Route {job['route_number']} processing failed (see worker output in {job['project_folder']})")
+                failed += 1
+        print("-" * 50)
+    
     # Summary
     print(f"\n{'='*60}")
     print(f"COMBINED PROCESSING SUMMARY")
     print(f"{'='*60}")
-    print(f"Total routes: {len(dcim_folders)}")
+    print(f"Total routes: {len(routes)}")
     print(f"Successful: {successful}")
     print(f"Failed: {failed}")
     print(f"Output location: {output_path}")
@@ -403,9 +692,9 @@ def process_combined_routes(dcim_path, output_path, gcp_path):
 
 def show_available_combined_routes(dcim_path):
     """Display all available combined routes with details"""
-    dcim_folders = scan_dcim_folders_combined(dcim_path)
+    routes = scan_dcim_folders_combined(dcim_path)
     
-    if not dcim_folders:
+    if not routes:
         print("No combined routes found!")
         return []
     
@@ -414,18 +703,18 @@ def show_available_combined_routes(dcim_path):
     total_rgb = 0
     total_ms = 0
     
-    for route_number, data in dcim_folders.items():
-        rgb_count = len(data['rgb_images'])
-        ms_count = len(data['ms_images'])
+    for route in routes:
+        rgb_count = len(route.rgb_images)
+        ms_count = len(route.ms_images)
         total_rgb += rgb_count
         total_ms += ms_count
         
-        print(f"Route {route_number}: {rgb_count} RGB + {ms_count} MS = {rgb_count + ms_count} total images")
+        print(f"Route {route.route_number}: {rgb_count} RGB + {ms_count} MS = {rgb_count + ms_count} total images")
     
     print("-" * 70)
-    print(f"Total: {len(dcim_folders)} routes with {total_rgb} RGB + {total_ms} MS images")
+    print(f"Total: {len(routes)} routes with {total_rgb} RGB + {total_ms} MS images")
     
-    return dcim_folders
+    return routes
 
 # Display usage instructions
 print("GENERIC COMBINED RGB+MS METASHAPE AUTOMATION SCRIPT LOADED")
@@ -440,6 +729,9 @@ print("")
 print("Usage examples:")
 print("1. process_combined_routes(dcim_path, output_path, gcp_path)")
 print("2. show_available_combined_routes(dcim_path)")
+print("3. process_combined_routes(dcim_path, output_path, gcp_path, max_workers=2, script_path=r'path\\to\\this_script.py')  # parallel routes")
+print("4. process_combined_routes(dcim_path, output_path, gcp_path, resume=True)  # continue the latest run, skipping finished stages")
+print("5. process_combined_routes(dcim_path, output_path, gcp_path, build_texture=False)  # skip the mesh texture")
 print("")
 print("GCP Files Expected:")
 print("- gcp_route_001.xml, gcp_route_002.xml, etc. in gcp_path folder")
@@ -455,3 +747,8 @@ print("dcim_path = r'C:\\path\\to\\project\\with\\DCIM\\folders'")
 print("output_path = r'C:\\path\\to\\output'")
 print("gcp_path = r'C:\\path\\to\\GCP'")
 print("process_combined_routes(dcim_path, output_path, gcp_path)")
+
+# Worker mode: started by process_combined_routes(max_workers > 1) as `metashape -r <script> --route-worker <job.json>`
+_argv = getattr(sys, 'argv', [])
+if WORKER_FLAG in _argv[:-1]:
+    _route_worker_main(_argv[_argv.index(WORKER_FLAG) + 1])
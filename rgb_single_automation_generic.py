@@ -9,22 +9,63 @@ exec(open(r'path\\to\\rgb_automation_generic.py', encoding='utf-8').read())
 """
 
 import os
-import glob
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import Metashape
 
-def enhanced_save_project(doc, chunk, project_path, step_name=""):
-    """Enhanced save function that ensures all products are stored"""
+try:
+    from lxml import etree
+except ImportError:  # lxml is not bundled with every Metashape Python; use the standard library parser
+    import xml.etree.ElementTree as etree
+
+# Lines collected in per-item loops and written to the console in one go by _flush_log()
+_log_buf = []
+
+# Pipeline stages after which process_rgb_route saves the project
+# (available: 'setup', 'match', 'align', 'depth_maps', 'point_cloud'; the final save always happens)
+CHECKPOINT_STAGES = {'align', 'point_cloud'}
+
+# Per-marker GCP details; enable with METASHAPE_VERBOSE=1 before loading or pass verbose=True
+VERBOSE = os.environ.get('METASHAPE_VERBOSE', '') not in ('', '0')
+
+# Smallest plausible saved .psx; the file only references the data in the .files folder
+MIN_PSX_BYTES = 64
+
+# Products verify_saved_products requires (tags as used in its missing_tags set)
+_CRITICAL = frozenset({'camera_alignment', 'point_cloud'})
+
+# Route folders: DJI_YYYYMMDDHHMM_###_* or DJI_YYYYMMDDHHMMSS_###_*
+_ROUTE_RE = re.compile(r'DJI_\d{12,14}_(\d{3})_')
+
+# RGB image name suffixes (upper case): 'D' identifier (also covers *_D.JPG), any JPG as backup
+_D_JPG_SUFFIX = 'D.JPG'
+_JPG_SUFFIX = '.JPG'
+
+# scan_dcim_folders results keyed by (dcim_path, mtime of dcim_path)
+_scan_cache = {}
+
+def _flush_log():
+    """Write the buffered log lines with a single console write"""
+    if _log_buf:
+        sys.stdout.write('\n'.join(_log_buf) + '\n')
+        _log_buf.clear()
+
+def enhanced_save_project(doc, chunk, project_path, step_name="", archive=False):
+    """Enhanced save function that ensures all products are stored
+    
+    archive=True packs the project data into the archive; use it for the final save only.
+    """
     try:
         print(f"Saving project{' after ' + step_name if step_name else ''}...")
         
-        # Ensure chunk is in document
-        if chunk not in doc.chunks:
+        # Ensure chunk is in document (compare keys: doc.chunks may return new wrapper objects)
+        if not any(c.key == chunk.key for c in doc.chunks):
             print("WARNING: Chunk not in document, adding it...")
             doc.append(chunk)
         
         # Save with explicit chunk specification
-        doc.save(project_path, chunks=[chunk], archive=True)
+        doc.save(project_path, chunks=[chunk], archive=archive)
         
         print(f"Project saved successfully{' after ' + step_name if step_name else ''}")
         return True
@@ -40,57 +81,101 @@ def enhanced_save_project(doc, chunk, project_path, step_name=""):
             print(f"Fallback save also failed: {str(e2)}")
             return False
 
-def verify_saved_products(project_path):
-    """Verify that all products are properly saved in the project file"""
+def _product_counts(chunk):
+    """Counts of the products checked by verify_saved_products"""
+    cameras = chunk.cameras or ()  # fetch the camera container once
+    return {
+        'aligned_cameras': sum(1 for cam in cameras if cam.transform is not None),
+        'total_cameras': len(cameras),
+        'tie_points': chunk.tie_points.point_count if chunk.tie_points else 0,
+        'point_cloud': chunk.point_cloud.point_count if chunk.point_cloud else 0,
+        'depth_maps': len(chunk.depth_maps.keys()) if chunk.depth_maps else 0,
+        'markers': len(chunk.markers) if chunk.markers else 0
+    }
+
+def _saved_project_looks_valid(project_path):
+    """Cheap check of a saved project: .psx of plausible size next to its .files folder"""
     try:
-        print("Verifying saved products...")
-        
-        # Open project in read-only mode to verify
-        test_doc = Metashape.Document()
-        test_doc.open(project_path)
-        
-        if not test_doc.chunks:
-            print("❌ No chunks found in saved project")
-            test_doc = None  # Close document
+        if os.stat(project_path).st_size < MIN_PSX_BYTES:
             return False
+    except OSError:
+        return False
+    return os.path.isdir(os.path.splitext(project_path)[0] + ".files")
+
+def verify_saved_products(project_path, expected_counts=None):
+    """Verify that all products are properly saved in the project file
+    
+    expected_counts are the _product_counts of the live chunk taken before the
+    save. When given and the saved files pass a cheap stat check they are
+    reported directly; the project is only re-opened from disk without them,
+    if that check fails, or when METASHAPE_DEEP_VERIFY=1 is set.
+    """
+    try:
+        deep_verify = os.environ.get('METASHAPE_DEEP_VERIFY') == '1'
+        if expected_counts is not None and not deep_verify and _saved_project_looks_valid(project_path):
+            print("Verifying saved products (counts from the saved chunk)...")
+            counts = expected_counts
+        else:
+            print("Verifying saved products...")
+            
+            # Open project in read-only mode to verify
+            test_doc = Metashape.Document()
+            test_doc.open(project_path)
             
-        test_chunk = test_doc.chunks[0]
+            if not test_doc.chunks:
+                print("❌ No chunks found in saved project")
+                test_doc = None  # Close document
+                return False
+                
+            counts = _product_counts(test_doc.chunks[0])
+            
+            # Close test document
+            test_doc = None
+            
+            if expected_counts is not None:
+                for product, expected in expected_counts.items():
+                    if counts[product] != expected:
+                        print(f"WARNING: {product}: {counts[product]} saved, {expected} expected")
         
-        # Check for each product
+        # Check for each product (missing ones are also recorded by tag)
         products_found = []
         products_missing = []
+        missing_tags = set()
         
         # Check cameras and alignment
-        aligned_cameras = len([cam for cam in test_chunk.cameras if cam.transform]) if test_chunk.cameras else 0
-        total_cameras = len(test_chunk.cameras) if test_chunk.cameras else 0
-        if aligned_cameras > 0:
-            products_found.append(f"Camera alignment ({aligned_cameras}/{total_cameras})")
+        if counts['aligned_cameras'] > 0:
+            products_found.append(f"Camera alignment ({counts['aligned_cameras']}/{counts['total_cameras']})")
         else:
             products_missing.append("Camera alignment")
+            missing_tags.add('camera_alignment')
             
         # Check tie points
-        if test_chunk.tie_points and test_chunk.tie_points.point_count > 0:
-            products_found.append(f"Tie points ({test_chunk.tie_points.point_count})")
+        if counts['tie_points'] > 0:
+            products_found.append(f"Tie points ({counts['tie_points']})")
         else:
             products_missing.append("Tie points")
+            missing_tags.add('tie_points')
             
         # Check point cloud
-        if test_chunk.point_cloud and test_chunk.point_cloud.point_count > 0:
-            products_found.append(f"Point cloud ({test_chunk.point_cloud.point_count:,} points)")
+        if counts['point_cloud'] > 0:
+            products_found.append(f"Point cloud ({counts['point_cloud']:,} points)")
         else:
             products_missing.append("Point cloud")
+            missing_tags.add('point_cloud')
             
         # Check depth maps
-        if test_chunk.depth_maps and len(test_chunk.depth_maps.keys()) > 0:
-            products_found.append(f"Depth maps ({len(test_chunk.depth_maps.keys())} cameras)")
+        if counts['depth_maps'] > 0:
+            products_found.append(f"Depth maps ({counts['depth_maps']} cameras)")
         else:
             products_missing.append("Depth maps")
+            missing_tags.add('depth_maps')
             
         # Check markers
-        if test_chunk.markers and len(test_chunk.markers) > 0:
-            products_found.append(f"GCP markers ({len(test_chunk.markers)})")
+        if counts['markers'] > 0:
+            products_found.append(f"GCP markers ({counts['markers']})")
         else:
             products_missing.append("GCP markers")
+            missing_tags.add('markers')
         
         # Report results
         if products_found:
@@ -103,12 +188,8 @@ def verify_saved_products(project_path):
             for product in products_missing:
                 print(f"   ❌ {product}")
         
-        # Close test document
-        test_doc = None
-        
         # Return success if critical products exist
-        critical_products = ["Camera alignment", "Point cloud"]
-        critical_missing = [p for p in products_missing if any(cp in p for cp in critical_products)]
+        critical_missing = _CRITICAL & missing_tags
         
         if not critical_missing:
             print("✅ All critical products verified in saved project")
@@ -121,8 +202,53 @@ def verify_saved_products(project_path):
         print(f"❌ Error verifying saved products: {str(e)}")
         return False
 
-def import_gcps_from_xml(chunk, route_number, gcp_base_path):
-    """Import Ground Control Points from route-specific XML file"""
+def _prescan_gcp_xml(gcp_file_path):
+    """Stream a GCP XML file and return its markers as dicts (id, label, enabled, projections)
+    
+    Elements are freed as soon as they are read, so large marker files are never
+    held in memory as a whole. Projections are read from <projections> inside a
+    marker or from <location> entries of per-frame markers (marker_id="...").
+    """
+    markers = {}
+    frame_projections = {}
+    is_root = True
+    for event, elem in etree.iterparse(gcp_file_path, events=('start', 'end')):
+        if is_root:
+            is_root = False
+            if elem.tag != 'document':
+                raise ValueError(f"not a Metashape marker file (root element <{elem.tag}>, expected <document>)")
+        if event != 'end' or elem.tag != 'marker':
+            continue
+        
+        if 'marker_id' in elem.attrib:
+            marker_id = elem.get('marker_id')
+            frame_projections[marker_id] = frame_projections.get(marker_id, 0) + len(elem.findall('location'))
+        else:
+            reference = elem.find('reference')
+            enabled = reference is None or reference.get('enabled', 'true').lower() not in ('false', '0')
+            markers[elem.get('id')] = {
+                'id': elem.get('id'),
+                'label': elem.get('label'),
+                'enabled': enabled,
+                'projections': len(elem.findall('projections/projection'))
+            }
+        
+        # Free the element and, with lxml, the already processed siblings before it
+        elem.clear()
+        if hasattr(elem, 'getprevious'):
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    
+    for marker_id, count in frame_projections.items():
+        if marker_id in markers:
+            markers[marker_id]['projections'] += count
+    return list(markers.values())
+
+def import_gcps_from_xml(chunk, route_number, gcp_base_path, verbose=VERBOSE):
+    """Import Ground Control Points from route-specific XML file
+    
+    With verbose=True the projection count of every marker is listed as well.
+    """
     gcp_filename = f"gcp_route_{route_number}.xml"
     gcp_file_path = os.path.join(gcp_base_path, gcp_filename)
     
@@ -134,31 +260,100 @@ def import_gcps_from_xml(chunk, route_number, gcp_base_path):
         raise FileNotFoundError(f"GCP file not found for route {route_number}: {gcp_file_path}")
     
     try:
-        # Use Metashape's importMarkers method for XML marker files
+        # Validate and summarise the XML in one streaming pass, then let Metashape import it
+        gcp_markers = _prescan_gcp_xml(gcp_file_path)
         chunk.importMarkers(path=gcp_file_path)
         
         # Count imported markers
-        imported_count = len(chunk.markers)
-        enabled_count = sum(1 for marker in chunk.markers if marker.reference.enabled)
+        imported_count = len(gcp_markers)
+        enabled_count = sum(1 for marker in gcp_markers if marker['enabled'])
         
         print(f"Successfully imported {imported_count} GCP markers with pixel coordinates")
         print(f"Active GCPs: {enabled_count} (enabled markers for alignment)")
         print(f"Check Points: {imported_count - enabled_count} (disabled markers for accuracy validation)")
         
-        # Show marker details
-        for marker in chunk.markers:
-            # Count projections (pixel coordinates in images)
-            projections = sum(1 for camera in chunk.cameras if marker.projections[camera])
-            enabled_status = "[ENABLED]" if marker.reference.enabled else "[DISABLED]"
-            print(f"  {marker.label}: {projections} image projections {enabled_status}")
+        # Show marker details (projections = pixel coordinates in images)
+        if verbose:
+            # Projections attached to this chunk's cameras: one pass over each marker's own entries
+            chunk_projections = {
+                marker.label: sum(1 for _, projection in marker.projections.items() if projection)
+                for marker in chunk.markers
+            }
+            for marker in gcp_markers:
+                enabled_status = "[ENABLED]" if marker['enabled'] else "[DISABLED]"
+                projections = chunk_projections.get(marker['label'], 0)
+                in_file = f" ({marker['projections']} in file)" if projections != marker['projections'] else ""
+                _log_buf.append(f"  {marker['label']}: {projections} image projections{in_file} {enabled_status}")
+            _flush_log()
         
         return imported_count, enabled_count
         
     except Exception as e:
         raise RuntimeError(f"Error importing GCPs from {gcp_file_path}: {str(e)}")
 
-def scan_dcim_folders(dcim_path):
-    """Scan DCIM folder for route folders containing RGB images"""
+def _find_rgb_images(folder_path):
+    """Return the RGB images of a route folder
+    
+    JPGs with the 'D' identifier (*_D.JPG, *D.JPG); all JPGs as backup when there are none.
+    """
+    d_jpg, other_jpg = [], []
+    # One directory listing, matched case-insensitively as glob does on Windows
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            name_upper = entry.name.upper()
+            if name_upper.endswith(_D_JPG_SUFFIX):
+                d_jpg.append(entry.path)
+            elif name_upper.endswith(_JPG_SUFFIX):
+                other_jpg.append(entry.path)
+    return d_jpg or other_jpg
+
+def _summarize_rgb_images(folder_path):
+    """Return (image count, first image) of a route folder without building the image list"""
+    d_count = other_count = 0
+    d_sample = other_sample = None
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            name_upper = entry.name.upper()
+            if name_upper.endswith(_D_JPG_SUFFIX):
+                d_count += 1
+                d_sample = d_sample or entry.path
+            elif name_upper.endswith(_JPG_SUFFIX):
+                other_count += 1
+                other_sample = other_sample or entry.path
+    return (d_count, d_sample) if d_count else (other_count, other_sample)
+
+def invalidate_scan_cache():
+    """Forget cached DCIM scans so the next scan re-reads the disk"""
+    _scan_cache.clear()
+
+def scan_dcim_folders(dcim_path, *, collect_paths=False):
+    """Scan DCIM folder for route folders containing RGB images
+    
+    By default only the image count and one sample image are stored per route
+    ('image_files' is None); process_rgb_route lists the images again when it
+    needs them. With collect_paths=True 'image_files' holds all image paths.
+    The result is reused while the DCIM folder's mtime is unchanged (e.g.
+    show_available_routes followed by process_selected_routes); call
+    invalidate_scan_cache() after adding images to an existing route folder.
+    """
+    try:
+        cache_key = (dcim_path, os.stat(dcim_path).st_mtime_ns, collect_paths)
+    except OSError:
+        cache_key = None
+    if cache_key in _scan_cache:
+        print(f"Using cached DCIM scan for: {dcim_path}")
+        return list(_scan_cache[cache_key])
+    route_folders = _scan_dcim_folders_uncached(dcim_path, collect_paths)
+    if cache_key is not None:
+        _scan_cache[cache_key] = route_folders
+    return list(route_folders)
+
+def _scan_dcim_folders_uncached(dcim_path, collect_paths=False):
+    """Scan DCIM folder for route folders containing RGB images (no caching)"""
     route_folders = []
     
     if not os.path.exists(dcim_path):
@@ -167,40 +362,37 @@ def scan_dcim_folders(dcim_path):
     
     print(f"Scanning DCIM directory: {dcim_path}")
     
-    # Pattern to match route folders: DJI_YYYYMMDDHHMM_###_* or DJI_YYYYMMDDHHMMSS_###_*
-    pattern = r'DJI_\d{12,14}_(\d{3})_.*'
-    
-    for folder in os.listdir(dcim_path):
-        folder_path = os.path.join(dcim_path, folder)
-        if os.path.isdir(folder_path):
-            match = re.match(pattern, folder)
-            if match:
-                route_number = match.group(1)
-                
-                # Count RGB images (JPG files with 'D' identifier)
-                rgb_pattern = os.path.join(folder_path, "*_D.JPG")
-                rgb_files = glob.glob(rgb_pattern)
-                
-                # Also try without underscore before D (in case naming varies)
-                if not rgb_files:
-                    rgb_pattern_alt = os.path.join(folder_path, "*D.JPG")
-                    rgb_files = glob.glob(rgb_pattern_alt)
-                
-                # Count all JPG files as backup
-                if not rgb_files:
-                    all_jpg = glob.glob(os.path.join(folder_path, "*.JPG"))
-                    all_jpg.extend(glob.glob(os.path.join(folder_path, "*.jpg")))
-                    rgb_files = all_jpg
-                
-                if rgb_files:
-                    route_folders.append({
-                        'folder_name': folder,
-                        'folder_path': folder_path,
-                        'route_number': route_number,
-                        'rgb_count': len(rgb_files),
-                        'image_files': rgb_files
-                    })
-                    print(f"  Found Route {route_number}: {len(rgb_files)} RGB images")
+    # One scandir pass; DirEntry.is_dir() needs no extra stat call
+    candidates = []
+    with os.scandir(dcim_path) as it:
+        for entry in it:
+            # Cheap prefix test first; the regex only runs on DJI_ folders
+            if entry.name.startswith('DJI_') and entry.is_dir():
+                match = _ROUTE_RE.match(entry.name)
+                if match:
+                    candidates.append((entry.name, entry.path, match.group(1)))
+    
+    # List the route folders in parallel to overlap I/O latency (SD cards, network shares)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        folder_paths = [folder_path for _, folder_path, _ in candidates]
+        if collect_paths:
+            summaries = [(len(files), files[0] if files else None, files)
+                         for files in executor.map(_find_rgb_images, folder_paths)]
+        else:
+            summaries = [(count, sample, None) for count, sample in executor.map(_summarize_rgb_images, folder_paths)]
+    
+    for (folder, folder_path, route_number), (rgb_count, sample_image, image_files) in zip(candidates, summaries):
+        if rgb_count:
+            route_folders.append({
+                'folder_name': folder,
+                'folder_path': folder_path,
+                'route_number': route_number,
+                'rgb_count': rgb_count,
+                'sample_image': sample_image,
+                'image_files': image_files
+            })
+            _log_buf.append(f"  Found Route {route_number}: {rgb_count} RGB images")
+    _flush_log()
     
     return sorted(route_folders, key=lambda x: x['route_number'])
 
@@ -216,23 +408,23 @@ def create_project_structure(route_info, output_base):
     
     while True:
         project_path = os.path.join(output_base, project_folder)
-        project_full_path = os.path.join(project_path, project_file)
-        
-        # Check if folder exists and has files in it
-        if os.path.exists(project_path):
-            # Check if there are any files in the folder (not just empty)
-            if os.listdir(project_path):  # Folder exists and has files
-                version += 1
-                project_folder = f"{base_project_folder}_v{version}"
-                project_file = f"route_{route_info['route_number']}_RGB_v{version}.psx"
-                print(f"Folder {base_project_folder} exists, trying {project_folder}")
-                continue
-            else:
-                # Folder exists but is empty, we can use it
-                break
-        else:
+        
+        # Check if folder exists and has files in it (one scandir, stops at the first entry)
+        try:
+            with os.scandir(project_path) as it:
+                non_empty = next(it, None) is not None
+        except FileNotFoundError:
             # Folder doesn't exist, we can create it
             break
+        
+        if not non_empty:
+            # Folder exists but is empty, we can use it
+            break
+        
+        version += 1
+        project_folder = f"{base_project_folder}_v{version}"
+        project_file = f"route_{route_info['route_number']}_RGB_v{version}.psx"
+        print(f"Folder {base_project_folder} exists, trying {project_folder}")
     
     # Create the final folder structure
     os.makedirs(project_path, exist_ok=True)
@@ -243,33 +435,55 @@ def create_project_structure(route_info, output_base):
     
     return project_path, project_full_path
 
-def process_rgb_route(route_info, output_base, gcp_base_path):
+def _pipeline_params(rgb_count):
+    """Processing settings by route size (Small < 200 <= Medium < 400 <= Large images)
+    
+    Small routes are processed at higher resolution, large routes coarser so
+    depth maps (cost ~ 1/downscale^2) stay manageable.
+    """
+    if rgb_count < 200:
+        return {'match_downscale': 1, 'depth_downscale': 2, 'points_spacing': 0.05}
+    if rgb_count < 400:
+        return {'match_downscale': 2, 'depth_downscale': 4, 'points_spacing': 0.1}
+    return {'match_downscale': 2, 'depth_downscale': 8, 'points_spacing': 0.2}
+
+def process_rgb_route(route_info, output_base, gcp_base_path, verbose=VERBOSE):
     """Process a single route with RGB images only"""
     print(f"\n{'='*60}")
     print(f"PROCESSING ROUTE {route_info['route_number']} - RGB ONLY")
     print(f"{'='*60}")
     print(f"Folder: {route_info['folder_name']}")
     print(f"Images: {route_info['rgb_count']} RGB files")
+    params = _pipeline_params(route_info['rgb_count'])
     
     # Create project structure
     project_path, project_full_path = create_project_structure(route_info, output_base)
     print(f"Project will be saved to: {project_full_path}")
     print(f"GCP files location: {gcp_base_path}")
     
-    # Get image files
-    image_files = route_info['image_files']
-    
-    if not image_files:
-        print("ERROR: No RGB images found!")
-        return False
-    
     try:
+        # Get image files (listed now unless the scan collected them); inside
+        # the try so an unreadable folder fails this route, not the whole batch
+        image_files = route_info.get('image_files') or _find_rgb_images(route_info['folder_path'])
+        
+        if not image_files:
+            print("ERROR: No RGB images found!")
+            return False
+        
         # Create new Metashape document and chunk
         print("\nStep 0: Creating new project...")
         doc = Metashape.Document()
         chunk = doc.addChunk()
         chunk.label = f"Route_{route_info['route_number']}_RGB"
         
+        def checkpoint(stage):
+            """Save the project if stage is one of CHECKPOINT_STAGES"""
+            if stage not in CHECKPOINT_STAGES:
+                return False
+            print(f"Saving project after {stage} checkpoint...")
+            doc.save(project_full_path, chunks=[chunk], archive=False)
+            return True
+        
         # Set initial coordinate system (WGS84 for images)
         chunk.crs = Metashape.CoordinateSystem("EPSG::4326")
         print("Initial coordinate system set to WGS84 (EPSG:4326) for image GPS data")
@@ -277,17 +491,19 @@ def process_rgb_route(route_info, output_base, gcp_base_path):
         # Add photos
         print(f"\nStep 1: Adding {len(image_files)} RGB images...")
         chunk.addPhotos(image_files)
+        del image_files
         
         # Verify photos were added
-        if len(chunk.cameras) == 0:
+        camera_count = len(chunk.cameras)
+        if camera_count == 0:
             print("ERROR: No cameras were added to the project!")
             return False
         
-        print(f"Successfully added {len(chunk.cameras)} cameras")
+        print(f"Successfully added {camera_count} cameras")
         
         # Import Ground Control Points
         try:
-            imported_count, enabled_count = import_gcps_from_xml(chunk, route_info['route_number'], gcp_base_path)
+            imported_count, enabled_count = import_gcps_from_xml(chunk, route_info['route_number'], gcp_base_path, verbose)
             
             # Set project coordinate system to ETRS89 after GCP import
             print(f"\nSetting project coordinate system to ETRS89 (EPSG:4258)...")
@@ -300,15 +516,15 @@ def process_rgb_route(route_info, output_base, gcp_base_path):
             return False
         
         # Save project with GCPs
-        doc.save(project_full_path, chunks=[chunk])
-        print(f"Project saved with {imported_count} GCPs imported")
+        if checkpoint('setup'):
+            print(f"Project saved with {imported_count} GCPs imported")
         
         # Step 2: Match Photos
         print(f"\nStep 2: Matching photos...")
-        print("  Settings: Downscale=1 (full resolution), Generic preselection=True, Reference preselection=True")
+        print(f"  Settings: Downscale={params['match_downscale']}, Generic preselection=True, Reference preselection=True")
         
         chunk.matchPhotos(
-            downscale=1,  # Full resolution
+            downscale=params['match_downscale'],  # 1 = full resolution
             generic_preselection=True,
             reference_preselection=True  # Use GCPs for photo matching
         )
@@ -320,31 +536,29 @@ def process_rgb_route(route_info, output_base, gcp_base_path):
         if tie_points == 0:
             print("WARNING: No tie points found! Photo matching may have failed.")
         
-        # Force save after photo matching
-        print("Saving project after photo matching...")
-        doc.save(project_full_path, chunks=[chunk])
-        print("Photo matching results saved successfully")
+        # Tie points are regenerated cheaply if alignment has to be rerun
+        checkpoint('match')
         
         # Step 3: Align Cameras
         print(f"\nStep 3: Aligning cameras...")
         chunk.alignCameras(adaptive_fitting=False)
         
         # Check alignment results
-        aligned_cameras = len([cam for cam in chunk.cameras if cam.transform])
-        total_cameras = len(chunk.cameras)
+        cameras = chunk.cameras  # fetch the camera container once
+        total_cameras = len(cameras)
+        aligned_cameras = sum(1 for cam in cameras if cam.transform is not None)
         alignment_ratio = aligned_cameras / total_cameras if total_cameras > 0 else 0
         
         print(f"Camera alignment completed: {aligned_cameras}/{total_cameras} cameras aligned ({alignment_ratio:.1%})")
         
         if aligned_cameras == 0:
             print("ERROR: No cameras aligned! Cannot proceed with processing.")
-            doc.save(project_full_path, chunks=[chunk])  # Save the failed state for debugging
+            doc.save(project_full_path, chunks=[chunk], archive=False)  # Save the failed state for debugging
             return False
         
         # Save after successful camera alignment
-        print("Saving project after camera alignment...")
-        doc.save(project_full_path, chunks=[chunk])
-        print("Camera alignment results saved successfully")
+        if checkpoint('align'):
+            print("Camera alignment results saved successfully")
         
         # Display GCP information
         if chunk.markers:
@@ -353,37 +567,34 @@ def process_rgb_route(route_info, output_base, gcp_base_path):
         
         # Step 4: Build Depth Maps
         print(f"\nStep 4: Building depth maps...")
-        print("  Settings: Quality=Medium (4), Filter=MildFiltering, Max neighbors=16")
+        print(f"  Settings: Downscale={params['depth_downscale']}, Filter=MildFiltering, Max neighbors=16")
         chunk.buildDepthMaps(
-            downscale=4,  # Medium quality
+            downscale=params['depth_downscale'],  # 2 = High, 4 = Medium, 8 = Low quality
             filter_mode=Metashape.FilterMode.MildFiltering,
             max_neighbors=16
         )
         
-        # Force save after depth maps
-        print("Saving project after depth maps...")
-        doc.save(project_full_path, chunks=[chunk])
-        print("Depth maps completed and saved successfully")
+        # Depth maps are stored with the point cloud checkpoint
+        checkpoint('depth_maps')
+        print("Depth maps completed")
         
         # Step 5: Build Point Cloud
         print(f"\nStep 5: Building point cloud...")
-        print("  Settings: Source=Depth maps, Point colors=True, Spacing=0.1m")
+        print(f"  Settings: Source=Depth maps, Point colors=True, Spacing={params['points_spacing']}m")
         chunk.buildPointCloud(
             source_data=Metashape.DataSource.DepthMapsData,
             point_colors=True,
-            points_spacing=0.1  # 0.1 meters
+            points_spacing=params['points_spacing']  # meters
         )
         
-        # Check point cloud results and force save
+        # Check point cloud results and save (even if point cloud failed)
         if chunk.point_cloud:
             point_count = chunk.point_cloud.point_count
             print(f"Point cloud completed: {point_count:,} points generated")
-            print("Saving project after point cloud generation...")
-            doc.save(project_full_path, chunks=[chunk])
-            print("Point cloud saved successfully")
         else:
             print("WARNING: No point cloud was generated!")
-            doc.save(project_full_path, chunks=[chunk])  # Save even if point cloud failed
+        if checkpoint('point_cloud'):
+            print("Point cloud saved successfully")
         
         # Step 6: Generate Processing Report
         print(f"\nStep 6: Generating processing report...")
@@ -393,13 +604,14 @@ def process_rgb_route(route_info, output_base, gcp_base_path):
         
         # Final comprehensive save with all processing results
         print(f"\nStep 7: Final project save...")
-        save_success = enhanced_save_project(doc, chunk, project_full_path, "final processing")
+        expected_counts = _product_counts(chunk)
+        save_success = enhanced_save_project(doc, chunk, project_full_path, "final processing", archive=True)
         if not save_success:
             print("ERROR: Failed to save final project!")
             return False
         
         # Verify all products are saved
-        verification_success = verify_saved_products(project_full_path)
+        verification_success = verify_saved_products(project_full_path, expected_counts)
         if not verification_success:
             print("WARNING: Product verification failed - some data may not be properly saved")
         
@@ -417,7 +629,7 @@ def process_rgb_route(route_info, output_base, gcp_base_path):
         print("Processing failed!")
         return False
 
-def process_all_routes(dcim_path, output_path, gcp_path):
+def process_all_routes(dcim_path, output_path, gcp_path, verbose=VERBOSE):
     """Process all routes found in DCIM folder"""
     print("METASHAPE RGB AUTOMATION")
     print("=" * 50)
@@ -444,7 +656,7 @@ def process_all_routes(dcim_path, output_path, gcp_path):
     failed = 0
     
     for route in routes:
-        success = process_rgb_route(route, output_path, gcp_path)
+        success = process_rgb_route(route, output_path, gcp_path, verbose)
         if success:
             successful += 1
         else:
@@ -463,7 +675,7 @@ def process_all_routes(dcim_path, output_path, gcp_path):
     
     return successful > 0
 
-def process_single_route_by_number(route_number, dcim_path, output_path, gcp_path):
+def process_single_route_by_number(route_number, dcim_path, output_path, gcp_path, verbose=VERBOSE):
     """Process a specific route by route number"""
     routes = scan_dcim_folders(dcim_path)
     target_route = None
@@ -478,9 +690,9 @@ def process_single_route_by_number(route_number, dcim_path, output_path, gcp_pat
         print(f"Available routes: {[r['route_number'] for r in routes]}")
         return False
     
-    return process_rgb_route(target_route, output_path, gcp_path)
+    return process_rgb_route(target_route, output_path, gcp_path, verbose)
 
-def process_selected_routes(route_numbers, dcim_path, output_path, gcp_path):
+def process_selected_routes(route_numbers, dcim_path, output_path, gcp_path, verbose=VERBOSE):
     """Process specific routes by route numbers (e.g., ['001', '003', '005'])"""
     print("METASHAPE RGB AUTOMATION - SELECTED ROUTES")
     print("=" * 50)
@@ -519,7 +731,7 @@ def process_selected_routes(route_numbers, dcim_path, output_path, gcp_path):
     failed = 0
     
     for route in selected_routes:
-        success = process_rgb_route(route, output_path, gcp_path)
+        success = process_rgb_route(route, output_path, gcp_path, verbose)
         if success:
             successful += 1
         else:
@@ -572,6 +784,8 @@ print("2. show_available_routes(dcim_path)")
 print("3. process_selected_routes(['001', '003'], dcim_path, output_path, gcp_path)")
 print("4. process_single_route_by_number('001', dcim_path, output_path, gcp_path)")
 print("")
+print("Add verbose=True (or set METASHAPE_VERBOSE=1) to list per-marker GCP projections")
+print("")
 print("GCP Files Expected:")
 print("- gcp_route_001.xml, gcp_route_002.xml, etc. in gcp_path folder")
 print("")